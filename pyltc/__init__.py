@@ -1,6 +1,25 @@
-import pkg_resources
+import sys
 
-try:
-    __version__ = pkg_resources.require('python-ltc')[0].version
-except: # pragma: no cover
-    __version__ = 'unknown'
+def get_version():
+    try:
+        from importlib.metadata import version, PackageNotFoundError
+    except ImportError:
+        try:
+            import pkg_resources
+            return pkg_resources.require('python-ltc')[0].version
+        except: # pragma: no cover
+            return 'unknown'
+    try:
+        return version('python-ltc')
+    except PackageNotFoundError:
+        return 'unknown'
+
+if sys.version_info >= (3, 7):
+    def __getattr__(name):
+        if name == '__version__':
+            global __version__
+            __version__ = get_version()
+            return __version__
+        raise AttributeError('module {!r} has no attribute {!r}'.format(__name__, name))
+else: # pragma: no cover
+    __version__ = get_version()
@@ -0,0 +1,105 @@
+import asyncio
+import collections
+
+try:
+    get_running_loop = asyncio.get_running_loop
+except AttributeError: # pragma: no cover
+    get_running_loop = asyncio.get_event_loop
+
+from pyltc.frames import monotonic_ns
+from pyltc.tcgen import FrameScheduler
+
+
+class AsyncFrameSource(FrameScheduler):
+    queue_size = 8
+    def __init__(self, generator, loop=None):
+        self.setup_scheduler(generator)
+        if loop is None:
+            loop = get_running_loop()
+        self.loop = loop
+        self.waiters = []
+        self.iterators = set()
+        self.timer_handle = None
+        self.running = False
+    def start(self):
+        if self.running:
+            return
+        g = self.generator
+        self.running = True
+        self.reset()
+        if g.use_current_time:
+            g.set_frame_from_monotonic(self.start_ns)
+        g.running.set()
+        self.schedule_next()
+    def stop(self):
+        if not self.running:
+            return
+        self.running = False
+        if self.timer_handle is not None:
+            self.timer_handle.cancel()
+            self.timer_handle = None
+        self.generator.running.clear()
+        waiters, self.waiters = self.waiters, []
+        for fut in waiters:
+            if not fut.done():
+                fut.cancel()
+        for it in list(self.iterators):
+            it.close()
+    def schedule_next(self):
+        deadline = self.get_deadline(self.tick + 1)
+        delay = max(0, deadline - monotonic_ns()) / 1e9
+        self.timer_handle = self.loop.call_later(delay, self.on_timer)
+    def on_timer(self):
+        self.timer_handle = None
+        if not self.running:
+            return
+        now = monotonic_ns()
+        if now >= self.get_deadline(self.tick + 1):
+            self.advance(now)
+            timecode = self.generator.frame.timecode
+            waiters, self.waiters = self.waiters, []
+            for fut in waiters:
+                if not fut.done():
+                    fut.set_result(timecode)
+            for it in self.iterators:
+                it.put(timecode)
+        self.schedule_next()
+    def next_frame(self):
+        fut = self.loop.create_future()
+        self.waiters.append(fut)
+        return fut
+    def frames(self, queue_size=None):
+        return AsyncFrameIterator(self, queue_size)
+
+
+class AsyncFrameIterator(object):
+    def __init__(self, source, queue_size=None):
+        if queue_size is None:
+            queue_size = source.queue_size
+        self.source = source
+        self.queue = collections.deque(maxlen=queue_size)
+        self.waiter = None
+        self.closed = False
+        source.iterators.add(self)
+    def put(self, timecode):
+        self.queue.append(timecode)
+        self.wake()
+    def wake(self):
+        if self.waiter is not None and not self.waiter.done():
+            self.waiter.set_result(None)
+    def close(self):
+        self.closed = True
+        self.source.iterators.discard(self)
+        self.wake()
+    def __aiter__(self):
+        return self
+    async def __anext__(self):
+        while not len(self.queue):
+            if self.closed:
+                raise StopAsyncIteration
+            self.waiter = self.source.loop.create_future()
+            try:
+                await self.waiter
+            finally:
+                self.waiter = None
+        return self.queue.popleft()
@@ -1,5 +1,6 @@
 import threading
 import time
+import math
 import array
 import collections
 import datetime
@@ -8,19 +9,32 @@ import numpy as np
 import jack
 
 from pyltc.audio.base import AudioBackend
-from pyltc.tcgen import AudioGenerator
+from pyltc.frames import monotonic_ns
+from pyltc.tcgen import AudioGenerator, MultiChannelGenerator
 from pyltc.mtc import MTCDataBlock
 
 class SampleBuffer(object):
     def __init__(self, **kwargs):
         b = self.backend = kwargs.get('backend')
         self.sampwidth = 4
-        self.block_size_bytes = b.block_size * b.queue_length * self.sampwidth
+        self.queue_samples = b.queue_samples
+        self.low_water_bytes = b.low_water_samples * self.sampwidth
+        self.block_size_bytes = self.queue_samples * self.sampwidth
         self.buffer = jack.RingBuffer(self.block_size_bytes)
         self.total_size = self.buffer.write_space
+        self.scratch = np.zeros(self.queue_samples, dtype=np.float32)
     @property
     def ready(self):
         return self.buffer.write_space >= self.block_size_bytes
+    @property
+    def num_samples(self):
+        return self.buffer.read_space // self.sampwidth
+    @property
+    def missing_samples(self):
+        n = min(self.queue_samples - self.num_samples, self.buffer.write_space // self.sampwidth)
+        return max(n, 0)
+    def below_low_water(self):
+        return self.buffer.read_space < self.low_water_bytes
     def fill_zeros(self):
         sp = self.buffer.write_space
         if not sp:
@@ -43,6 +57,11 @@ class SampleBuffer(object):
     def read(self, size):
         size = size * self.sampwidth
         return self.buffer.read(size)
+    def read_into(self, out):
+        n = self.buffer.readinto(out) // self.sampwidth
+        if n < out.size:
+            out[n:] = 0
+        return n
     def clear(self):
         self.buffer.reset()
     def __len__(self):
@@ -107,21 +126,248 @@ class MTCBuffer(object):
             i += 1
         return l
 
+class JackClock(object):
+    bandwidth = .5
+    frame_mask = 0xFFFFFFFF
+    def __init__(self, **kwargs):
+        self.sample_rate = kwargs.get('sample_rate')
+        self.bandwidth = kwargs.get('bandwidth', self.bandwidth)
+        self.raw_frame = None
+        self.frame = 0
+        self.period_size = None
+        self.state = None
+        self.initialized = False
+    def reset(self):
+        self.raw_frame = None
+        self.initialized = False
+    def init_filter(self, size, now_ns):
+        period_ns = size * 1e9 / self.sample_rate
+        omega = 2 * math.pi * self.bandwidth * size / float(self.sample_rate)
+        self.b = math.sqrt(2) * omega
+        self.c = omega * omega
+        self.e2 = period_ns
+        self.t0 = float(now_ns)
+        self.t1 = self.t0 + period_ns
+        self.period_size = size
+        self.initialized = True
+    def update(self, raw_frame, size, now_ns):
+        if self.raw_frame is None:
+            self.frame = raw_frame
+            delta = None
+        else:
+            delta = (raw_frame - self.raw_frame) & self.frame_mask
+            self.frame += delta
+        self.raw_frame = raw_frame
+        if not self.initialized or delta != self.period_size or size != self.period_size:
+            self.init_filter(size, now_ns)
+        else:
+            e = now_ns - self.t1
+            self.t0 = self.t1
+            self.t1 += self.b * e + self.e2
+            self.e2 += self.c * e
+        self.f0 = self.frame
+        self.f1 = self.frame + size
+        self.state = (self.f1, self.t1, self.e2 / size)
+    def frame_to_ns(self, frame, state=None):
+        if state is None:
+            state = self.state
+        f1, t1, frame_ns = state
+        return int(round(t1 + (frame - f1) * frame_ns))
+
+class LTCOutput(object):
+    def __init__(self, **kwargs):
+        self.backend = kwargs.get('backend')
+        self.generator = kwargs.get('generator')
+        self.name = kwargs.get('name')
+        self.connections = kwargs.get('connections', [])
+        self.offset = kwargs.get('offset', 0)
+        self.port = None
+        self.underruns = 0
+        self.missed_samples = 0
+        self.skipped_samples = 0
+        self.anchor_ns = None
+        self.anchor_sample = None
+        self.drift_samples = 0
+        self.drift_corrections = 0
+        self.corrected_samples = 0
+        self.buffer = self.build_buffer()
+    def build_buffer(self):
+        return SampleBuffer(backend=self.backend)
+    def register(self, client):
+        self.port = client.outports.register(self.name)
+    def connect(self, client):
+        for dest in self.connections:
+            client.connect(self.port, dest)
+    def unregister(self):
+        if self.port is None:
+            return
+        self.port.disconnect()
+        self.port.unregister()
+        self.port = None
+    def set_frame_from_dt(self, dt=None, ts=None):
+        if self.offset:
+            if dt is not None:
+                dt += datetime.timedelta(seconds=self.offset)
+            else:
+                ts += self.offset
+        self.generator.set_frame_from_dt(dt=dt, ts=ts)
+    def set_sample_from_monotonic(self, mono_ns):
+        self.anchor_ns = mono_ns
+        mono_ns += int(round(self.offset * 1e9))
+        self.generator.set_sample_from_monotonic(mono_ns)
+        self.anchor_sample = self.generator.sample_position
+        self.skipped_samples = self.missed_samples
+        self.drift_samples = 0
+    def skip_missed_samples(self):
+        missed = self.missed_samples - self.skipped_samples
+        if not missed:
+            return 0
+        self.skipped_samples += missed
+        g = self.generator
+        g.seek_sample(g.sample_position + missed)
+        return missed
+    def get_drift(self, write_ns):
+        g = self.generator
+        elapsed = (write_ns - self.anchor_ns) * g.sample_rate // 1000000000
+        return self.anchor_sample + elapsed - g.sample_position
+    def check_drift(self):
+        if self.anchor_ns is None:
+            return 0
+        write_ns = self.backend.get_write_time(self)
+        drift = self.get_drift(write_ns)
+        if abs(drift) >= self.generator.samples_per_frame:
+            self.set_sample_from_monotonic(write_ns)
+            return 0
+        if abs(drift) < self.backend.drift_threshold_samples:
+            drift = 0
+        self.drift_samples = drift
+        return drift
+    def correct_drift(self, a):
+        g = self.generator
+        drift = self.drift_samples
+        num_samples, offset = g.samples_for_frame(g.frame_count)
+        if drift > 0 and g.frame_sample_offset == 0:
+            i = 0
+        else:
+            i = num_samples - g.frame_sample_offset
+        if i + max(-drift, 0) > a.size:
+            return a
+        g.generate_into(a[:i])
+        if drift > 0:
+            g.seek_sample(g.sample_position + drift)
+        else:
+            a[i:i-drift] = a[i-1]
+            i -= drift
+        self.drift_samples = 0
+        self.drift_corrections += 1
+        self.corrected_samples += drift
+        return a[i:]
+    def generate_into(self, a):
+        if self.drift_samples:
+            a = self.correct_drift(a)
+        self.generator.generate_into(a)
+    def fill(self, silent=False):
+        buf = self.buffer
+        n = buf.missing_samples
+        if not n:
+            return 0
+        a = buf.scratch[:n]
+        if silent:
+            a[:] = 0
+        else:
+            self.skip_missed_samples()
+            self.generate_into(a)
+        return buf.write(a)
+    def get_group_key(self):
+        g = self.generator
+        if g.user_bits_stream is not None or self.drift_samples:
+            return None
+        return (
+            g.template, g.frame_format, g.frame_count, g.frame_sample_offset,
+            self.buffer.missing_samples,
+        )
+    def process(self, size, count_underruns=True):
+        out = self.port.get_array()
+        n = self.buffer.read_into(out)
+        if n < size and count_underruns:
+            self.underruns += 1
+            self.missed_samples += size - n
+        return self.buffer.below_low_water()
+
 class JackAudio(AudioBackend):
     block_size = 1024
-    queue_length = 32
+    queue_ms = 250
+    low_water_ms = None
+    drift_threshold_ms = .5
+    default_connections = ['system:playback_1', 'system:playback_2']
     def __init__(self, **kwargs):
         self._jack_ready = False
+        outputs = kwargs.get('outputs')
+        if not outputs:
+            outputs = [dict(
+                generator=kwargs.get('generator'),
+                connections=self.default_connections,
+            )]
+        if kwargs.get('generator') is None:
+            kwargs['generator'] = outputs[0]['generator']
         super(JackAudio, self).__init__(**kwargs)
         self.client_name = kwargs.get('client_name', 'LTCGenerator')
         self.enable_mtc = kwargs.get('enable_mtc', True)
-        self.buffer = self.build_buffer()
+        self.queue_ms = kwargs.get('queue_ms', self.queue_ms)
+        self.low_water_ms = kwargs.get('low_water_ms', self.low_water_ms)
+        if self.low_water_ms is None:
+            self.low_water_ms = self.queue_ms / 2.
+        self.drift_threshold_ms = kwargs.get('drift_threshold_ms', self.drift_threshold_ms)
+        self.refill_event = threading.Event()
+        self.mtc_event = threading.Event()
+        self.outputs = []
+        self.group_generators = {}
+        for output_kwargs in outputs:
+            self.add_output(**output_kwargs)
         self.buffer_time_offset = self.calc_buffer_time_offset()
         self.mtc_buffer = MTCBuffer()
         self.mtc_datablock = MTCDataBlock()
-        self.data_waiting = None
         self.process_timestamp = None
+        self.clock = JackClock(
+            sample_rate=self.sample_rate,
+            bandwidth=kwargs.get('clock_bandwidth', JackClock.bandwidth),
+        )
+        self.cycle = 0
+        self.aligned = False
         self.buffer_lock = threading.Lock()
+    def add_output(self, **kwargs):
+        if self.running:
+            raise Exception('Outputs must be added before the backend is started')
+        generator = kwargs.get('generator')
+        if generator.sample_rate != self.sample_rate:
+            raise ValueError('All generators must use a sample rate of {}'.format(self.sample_rate))
+        if generator.dtype != np.float32:
+            raise ValueError('Generators must produce float32 samples, not {}'.format(generator.dtype))
+        kwargs.setdefault('name', 'output_{}'.format(len(self.outputs) + 1))
+        kwargs['backend'] = self
+        output = LTCOutput(**kwargs)
+        self.outputs.append(output)
+        return output
+    @property
+    def buffer(self):
+        return self.outputs[0].buffer
+    @property
+    def outport(self):
+        return self.outputs[0].port
+    @property
+    def underruns(self):
+        return sum(output.underruns for output in self.outputs)
+    @property
+    def queue_samples(self):
+        n = int(round(self.queue_ms * self.sample_rate / 1000.))
+        return max(n, self.block_size)
+    @property
+    def low_water_samples(self):
+        n = int(round(self.low_water_ms * self.sample_rate / 1000.))
+        return min(max(n, self.block_size), self.queue_samples)
+    @property
+    def drift_threshold_samples(self):
+        return max(int(round(self.drift_threshold_ms * self.sample_rate / 1000.)), 1)
     @property
     def jack_ready(self):
         return self._jack_ready
@@ -139,34 +385,88 @@ class JackAudio(AudioBackend):
         t = self.client.frame_time
         return t - p_t
     def calc_buffer_time_offset(self):
-        rs = float(self.sample_rate)
-        buf_len = self.block_size * self.queue_length
-        return buf_len / rs
-    def build_buffer(self):
-        return SampleBuffer(backend=self)
+        return self.queue_samples / float(self.sample_rate)
     def fill_buffer(self):
-        if self.process_timestamp is None:
-            self.buffer.fill_zeros()
-            return
-        if self.data_waiting is not None:
-            a = self.data_waiting
-            self.data_waiting = None
-        else:
-            a = self.get_frames()
-        if not self.buffer.can_write(a):
-            self.data_waiting = a
-            return
+        silent = self.process_timestamp is None
+        if silent:
+            return sum(output.fill(silent) for output in self.outputs)
+        if not self.aligned:
+            self.align_outputs()
+        groups = collections.OrderedDict()
+        for output in self.outputs:
+            output.skip_missed_samples()
+            output.check_drift()
+            key = output.get_group_key()
+            if key is None:
+                key = output
+            groups.setdefault(key, []).append(output)
+        num_bytes = 0
+        for outputs in groups.values():
+            if len(outputs) == 1:
+                num_bytes += outputs[0].fill()
+            else:
+                num_bytes += self.fill_group(outputs)
+        return num_bytes
+    def get_group_generator(self, generator, num_channels):
+        key = (generator.template, generator.frame_format, num_channels)
+        mc = self.group_generators.get(key)
+        if mc is None:
+            mc = self.group_generators[key] = MultiChannelGenerator(
+                frame_format=generator.frame_format,
+                num_channels=num_channels,
+                sample_rate=generator.sample_rate,
+                bit_depth=generator.bit_depth,
+                use_float_samples=generator.use_float_samples,
+                dtype=generator.dtype,
+            )
+            mc.scratch = np.zeros((num_channels, self.queue_samples), dtype=mc.dtype)
+        return mc
+    def fill_group(self, outputs):
+        n = outputs[0].buffer.missing_samples
+        if not n:
+            return 0
+        g0 = outputs[0].generator
+        mc = self.get_group_generator(g0, len(outputs))
+        mc.set_total_frames([output.generator.frame.total_frames for output in outputs])
+        mc.set_user_bits([output.generator.user_bits for output in outputs])
+        mc.frame_count = g0.frame_count
+        mc.frame_sample_offset = g0.frame_sample_offset
+        a = mc.generate_into(mc.scratch[:,:n])
+        num_frames = mc.frame_count - g0.frame_count
+        num_bytes = 0
+        for i, output in enumerate(outputs):
+            g = output.generator
+            if num_frames:
+                g.incr_frame(num_frames)
+            g.frame_count = mc.frame_count
+            g.frame_sample_offset = mc.frame_sample_offset
+            num_bytes += output.buffer.write(a[i])
+        return num_bytes
+    def get_write_time(self, output):
         while True:
-            i = self.buffer.write(a)
-            a = self.get_frames()
-            if not self.buffer.can_write(a):
-                self.data_waiting = a
-                break
+            cycle = self.cycle
+            state = self.clock.state
+            num_samples = output.buffer.num_samples
+            if not cycle % 2 and cycle == self.cycle:
+                return self.clock.frame_to_ns(state[0] + num_samples, state)
+            time.sleep(0)
+    def align_outputs(self):
+        if not self.clock.initialized:
+            return False
+        for output in self.outputs:
+            if not output.generator.use_current_time:
+                continue
+            output.set_sample_from_monotonic(self.get_write_time(output))
+        self.aligned = True
+        return True
     def set_frame_from_dt(self, dt=None, ts=None):
         if dt is None and ts is None:
-            ts = time.time()
-            ts += self.buffer_time_offset
-        super(JackAudio, self).set_frame_from_dt(dt=dt, ts=ts)
+            self.aligned = False
+            return
+        for i, output in enumerate(self.outputs):
+            if i > 0 and not output.generator.use_current_time:
+                continue
+            output.set_frame_from_dt(dt=dt, ts=ts)
     def init_backend(self):
         self.buffer_thread = BufferThread(backend=self)
         self.mtc_thread = MTCThread(backend=self)
@@ -175,7 +475,8 @@ class JackAudio(AudioBackend):
             self.enable_mtc = False
         c.set_blocksize_callback(self.on_jack_blocksize)
         c.blocksize = self.block_size
-        o = self.outport = c.outports.register('output_1')
+        for output in self.outputs:
+            output.register(c)
         if self.enable_mtc:
             m = self.midiport = c.midi_inports.register('input')
         c.set_process_callback(self.jack_process_callback)
@@ -183,8 +484,8 @@ class JackAudio(AudioBackend):
         self.buffer_thread.start()
         self.buffer_thread.running.wait()
         self.client.activate()
-        self.client.connect(self.outport, 'system:playback_1')
-        self.client.connect(self.outport, 'system:playback_2')
+        for output in self.outputs:
+            output.connect(self.client)
         if self.enable_mtc:
             self.client.connect('system:midi_capture_1', self.midiport)
         self.mtc_thread.start()
@@ -197,8 +498,8 @@ class JackAudio(AudioBackend):
         self.buffer_thread = None
         self.mtc_thread.stop()
         self.mtc_thread = None
-        self.outport.disconnect()
-        self.outport.unregister()
+        for output in self.outputs:
+            output.unregister()
         if self.enable_mtc:
             self.midiport.disconnect()
             self.midiport.unregister()
@@ -233,41 +534,56 @@ class JackAudio(AudioBackend):
     def set_jack_transport(self):
         rs = self.sample_rate
         sample_offset = self.block_size * 2
-        ts_offset = sample_offset / float(rs)
         if not self.generator.use_current_time:
-            ts = float(self.generator.frame.total_frames / self.generator.frame.frame_format.rate)
-            frame = int(round(rs * ts) + sample_offset)
+            total_frames = self.generator.frame.total_frames
+            frame = self.generator.sample_clock.sample_offset(total_frames) + sample_offset
             self.client.transport_frame = frame
-            return
-        midnight = datetime.datetime.combine(datetime.date.today(), datetime.time())
-        now = datetime.datetime.now()
-        td = now - midnight
-        ts = td.total_seconds()
-        frame = int(round(rs * ts) + sample_offset)
-        self.client.transport_frame = frame
-        now += datetime.timedelta(seconds=ts_offset + self.buffer_time_offset)
-        self.set_frame_from_dt(dt=now)
+            return True
+        if not self.clock.initialized:
+            return False
+        wall_clock = self.generator.get_wall_clock()
+        state = self.clock.state
+        mono_ns = self.clock.frame_to_ns(state[0] + sample_offset, state)
+        ns = mono_ns + wall_clock.monotonic_offset_ns - wall_clock.midnight_ns
+        self.client.transport_frame = ns * rs // 1000000000
+        self.aligned = False
+        return True
     def on_jack_blocksize(self, size):
         if size == self.block_size:
             return
         print('blocksize change: {}'.format(size))
         with self.buffer_lock:
-            self.buffer.clear()
             self.block_size = size
-            self.buffer = self.build_buffer()
+            for output in self.outputs:
+                output.buffer.clear()
+                output.buffer = output.build_buffer()
+            self.group_generators.clear()
             self.buffer_time_offset = self.calc_buffer_time_offset()
-            self.data_waiting = None
+            self.aligned = False
         self.buffer_thread.idle.wait()
     def jack_process_callback(self, size):
-        a = self.buffer.read(size)
-        self.process_timestamp = self.client.last_frame_time
-        for o in self.client.outports:
-            o.get_buffer()[:] = a
+        now_ns = monotonic_ns()
+        self.cycle += 1
+        last_frame_time = self.client.last_frame_time
+        self.clock.update(last_frame_time, size, now_ns)
+        self.process_timestamp = last_frame_time
+        count_underruns = self._jack_ready
+        refill = False
+        for output in self.outputs:
+            if output.process(size, count_underruns):
+                refill = True
+        self.cycle += 1
+        if refill and not self.refill_event.is_set():
+            self.refill_event.set()
         if not self.enable_mtc:
             return
         m = self.client.midi_inports[0]
+        received = False
         for offset, data in m.incoming_midi_events():
             self.mtc_buffer.write(data)
+            received = True
+        if received and not self.mtc_event.is_set():
+            self.mtc_event.set()
     def get_mtc_data(self):
         s = self.mtc_datablock.second.value
         for qf in self.mtc_buffer.get_quarter_frames():
@@ -284,9 +600,10 @@ class BufferThread(threading.Thread):
         self.running = threading.Event()
         self.stopped = threading.Event()
         self.ready = threading.Event()
-        self.need_data = threading.Event()
+        self.need_data = self.get_event()
         self.idle = threading.Event()
-        self.wait_timeout = .01
+    def get_event(self):
+        return self.backend.refill_event
     def run(self):
         self.running.set()
         self.ready.wait()
@@ -295,7 +612,8 @@ class BufferThread(threading.Thread):
             self.backend.fill_buffer()
         print('buffer filled')
         while self.running.is_set():
-            self.need_data.wait(self.wait_timeout)
+            self.need_data.wait()
+            self.need_data.clear()
             self.idle.clear()
             if not self.running.is_set():
                 break
@@ -312,14 +630,13 @@ class MTCThread(BufferThread):
     def __init__(self, **kwargs):
         super(MTCThread, self).__init__(**kwargs)
         self.data_block = MTCDataBlock()
+    def get_event(self):
+        return self.backend.mtc_event
     def run(self):
-        if self.backend.enable_mtc:
-            self.wait_timeout = .1
-        else:
-            self.wait_timeout = None
         self.running.set()
         while self.running.is_set():
-            self.need_data.wait(self.wait_timeout)
+            self.need_data.wait()
+            self.need_data.clear()
             if not self.running.is_set():
                 break
             self.backend.get_mtc_data()
@@ -1,9 +1,77 @@
-import wave
+import struct
+from fractions import Fraction
 
 import numpy as np
-from scipy.interpolate import interp1d
-from scipy import signal
-import scipy.io.wavfile as wavfile
+
+from pyltc.fields import decode_datablocks
+
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_IEEE_FLOAT = 0x0003
+
+def write_wavefile(filename, sample_rate, data):
+    data = np.asarray(data)
+    if data.dtype.kind == 'f':
+        format_tag = WAVE_FORMAT_IEEE_FLOAT
+    elif data.dtype.kind in 'iu':
+        format_tag = WAVE_FORMAT_PCM
+    else:
+        raise ValueError('Unsupported sample dtype: {}'.format(data.dtype))
+    if data.ndim == 1:
+        channels = 1
+    else:
+        channels = data.shape[1]
+    data = data.astype(data.dtype.newbyteorder('<'))
+    block_align = channels * data.dtype.itemsize
+    fmt_chunk = struct.pack(
+        '<HHIIHH', format_tag, channels, sample_rate,
+        sample_rate * block_align, block_align, data.dtype.itemsize * 8,
+    )
+    raw = data.tobytes()
+    pad = len(raw) % 2
+    with open(filename, 'wb') as f:
+        f.write(b'RIFF')
+        f.write(struct.pack('<I', 4 + 8 + len(fmt_chunk) + 8 + len(raw) + pad))
+        f.write(b'WAVE')
+        f.write(b'fmt ')
+        f.write(struct.pack('<I', len(fmt_chunk)))
+        f.write(fmt_chunk)
+        f.write(b'data')
+        f.write(struct.pack('<I', len(raw)))
+        f.write(raw)
+        if pad:
+            f.write(b'\x00')
+
+def read_wavefile(filename):
+    with open(filename, 'rb') as f:
+        buf = f.read()
+    if buf[:4] != b'RIFF' or buf[8:12] != b'WAVE':
+        raise ValueError('Not a WAVE file: {}'.format(filename))
+    i = 12
+    dtype = None
+    while i + 8 <= len(buf):
+        chunk_id = buf[i:i+4]
+        chunk_size = struct.unpack('<I', buf[i+4:i+8])[0]
+        i += 8
+        if chunk_id == b'fmt ':
+            format_tag, channels, sample_rate, _, _, bits = struct.unpack(
+                '<HHIIHH', buf[i:i+16],
+            )
+            if format_tag == WAVE_FORMAT_IEEE_FLOAT:
+                dtype = np.dtype('<f{}'.format(bits // 8))
+            elif bits == 8:
+                dtype = np.dtype(np.uint8)
+            else:
+                dtype = np.dtype('<i{}'.format(bits // 8))
+        elif chunk_id == b'data':
+            if dtype is None:
+                raise ValueError('Missing fmt chunk: {}'.format(filename))
+            data = np.frombuffer(buf, dtype=dtype, count=chunk_size // dtype.itemsize, offset=i)
+            data = data.astype(dtype.newbyteorder('='))
+            if channels > 1:
+                data = data.reshape(-1, channels)
+            return sample_rate, data
+        i += chunk_size + chunk_size % 2
+    raise ValueError('Missing data chunk: {}'.format(filename))
 
 
 class Resampler(object):
@@ -32,9 +100,8 @@ class Resampler(object):
             strip_nans = True
         else:
             strip_nans = False
-        f = interp1d(self.in_periods, a, bounds_error=False, fill_value=np.nan)
         x = self.out_periods
-        r = f(x)
+        r = np.interp(x, self.in_periods, a, left=np.nan, right=np.nan)
         if strip_nans:
             r = r[~np.isnan(r)]
         if r.dtype is not self.dtype:
@@ -43,7 +110,109 @@ class Resampler(object):
             r[-1] = r[-2]
         return r
     def write_wavefile(self, a, filename):
-        wavfile.write(filename, self.out_sample_rate, a)
+        write_wavefile(filename, self.out_sample_rate, a)
+
+class BiphaseTemplate(object):
+    _registry = {}
+    def __init__(self, **kwargs):
+        self.sample_rate = kwargs.get('sample_rate')
+        self.frame_rate = kwargs.get('frame_rate')
+        self.bit_depth = int(kwargs.get('bit_depth', 16))
+        self.use_float_samples = kwargs.get('use_float_samples', False)
+        self.dtype = np.dtype(kwargs.get('dtype'))
+        self.num_samples = int(self.sample_rate / self.frame_rate)
+        if self.use_float_samples:
+            y_max = 1.
+        else:
+            y_max = int(((1 << self.bit_depth) / 2 - 1) / 2)
+        self.levels = np.array([-y_max, y_max], dtype=self.dtype)
+        self.cell_indices = {}
+    @classmethod
+    def get_template(cls, **kwargs):
+        kwargs.setdefault('bit_depth', 16)
+        kwargs.setdefault('use_float_samples', False)
+        frame_rate = getattr(kwargs['frame_rate'], 'value', kwargs['frame_rate'])
+        key = (
+            kwargs['sample_rate'], Fraction(frame_rate), np.dtype(kwargs['dtype']),
+            int(kwargs['bit_depth']), bool(kwargs['use_float_samples']),
+        )
+        obj = cls._registry.get(key)
+        if obj is None:
+            obj = cls._registry[key] = cls(**kwargs)
+        return obj
+    def get_cell_index(self, num_samples=None):
+        if num_samples is None:
+            num_samples = self.num_samples
+        ix = self.cell_indices.get(num_samples)
+        if ix is None:
+            edges = np.arange(161) * num_samples // 160
+            ix = np.repeat(np.arange(160, dtype=np.intp), np.diff(edges))
+            ix.setflags(write=False)
+            self.cell_indices[num_samples] = ix
+        return ix
+    def encode_cells(self, data):
+        data = np.asarray(data, dtype=bool)
+        flips = np.zeros(data.shape[:-1] + (160,), dtype=bool)
+        flips[..., 1::2] = data
+        flips[..., 2::2] = True
+        return np.logical_xor.accumulate(flips, axis=-1)
+    def render(self, data, num_samples=None, out=None):
+        cells = self.levels[self.encode_cells(data).view(np.uint8)]
+        return np.take(cells, self.get_cell_index(num_samples), out=out)
+    def render_frames(self, data, lengths, out=None):
+        lengths = np.asarray(lengths, dtype=np.intp)
+        if out is None:
+            out = np.empty(lengths.sum(), dtype=self.dtype)
+        if not lengths.size:
+            return out
+        cells = self.levels[self.encode_cells(data).view(np.uint8)]
+        # Render each run of equal-length frames straight into a view of out
+        bounds = np.flatnonzero(np.diff(lengths)) + 1
+        run_starts = [0] + bounds.tolist()
+        run_ends = bounds.tolist() + [lengths.size]
+        starts = (np.cumsum(lengths) - lengths).tolist()
+        for r0, r1 in zip(run_starts, run_ends):
+            num_samples = int(lengths[r0])
+            start = starts[r0]
+            view = out[start:start + (r1 - r0) * num_samples].reshape(r1 - r0, num_samples)
+            np.take(cells[r0:r1], self.get_cell_index(num_samples), axis=1, out=view, mode='clip')
+        return out
+
+class SampleClock(object):
+    def __init__(self, **kwargs):
+        self.sample_rate = int(kwargs.get('sample_rate'))
+        self.frame_rate = kwargs.get('frame_rate')
+        self._num = self.sample_rate * self.frame_rate.denom
+        self._den = self.frame_rate.numerator
+        self.samples_per_frame = Fraction(self._num, self._den)
+        self.even_samples = self.samples_per_frame.denominator == 1
+    def sample_offset(self, frame_index):
+        return frame_index * self._num // self._den
+    def frame_for_sample(self, sample_index):
+        return ((sample_index + 1) * self._den - 1) // self._num
+    def samples_for_frame(self, frame_index):
+        start = self.sample_offset(frame_index)
+        return self.sample_offset(frame_index + 1) - start, start
+    def frame_lengths(self, start_frame, num_frames):
+        ix = np.arange(start_frame, start_frame + num_frames + 1, dtype=np.int64)
+        offsets = ix * self._num // self._den
+        return np.diff(offsets), offsets[:-1]
+
+class FrameRenderer(object):
+    def __init__(self, template):
+        self.template = template
+        self.flips = np.zeros(160, dtype=bool)
+        self.flips[2::2] = True
+        self.cells = np.zeros(160, dtype=bool)
+        self.cell_levels = np.empty(160, dtype=template.dtype)
+    def set_data(self, data):
+        self.flips[1::2] = data
+        np.logical_xor.accumulate(self.flips, out=self.cells)
+        np.take(self.template.levels, self.cells.view(np.uint8), out=self.cell_levels, mode='clip')
+    def render(self, out, num_samples, start=0):
+        ix = self.template.get_cell_index(num_samples)[start:start+out.size]
+        np.take(self.cell_levels, ix, out=out, mode='clip')
+        return out
 
 class FrameResampler(Resampler):
     def __init__(self, **kwargs):
@@ -52,110 +221,203 @@ class FrameResampler(Resampler):
         out_sample_rate = kwargs.get('out_sample_rate')
         kwargs.setdefault('in_sample_rate', int(out_sample_rate / self.frame_rate))
         super(FrameResampler, self).__init__(**kwargs)
+        self.template = BiphaseTemplate.get_template(
+            sample_rate=self.out_sample_rate,
+            frame_rate=self.frame_rate,
+            bit_depth=self.bit_depth,
+            use_float_samples=self.use_float_samples,
+            dtype=self.dtype,
+        )
         self.data_block_sampler = LTCDataBlockSampler(
             out_sample_rate=self.in_sample_rate,
             bit_depth=self.bit_depth,
             use_float_samples=self.use_float_samples,
             dtype=self.dtype,
+            template=self.template,
         )
-    def generate_samples(self, data):
-        return self.data_block_sampler.generate_samples(data)
+    def generate_samples(self, data, num_samples=None):
+        return self.data_block_sampler.generate_samples(data, num_samples)
 
 class LTCDataBlockSampler(Resampler):
     def __init__(self, **kwargs):
         kwargs.setdefault('in_sample_rate', 160 * 10)
         super(LTCDataBlockSampler, self).__init__(**kwargs)
-    def generate_samples(self, data):
-        def iter_yvals():
-            if self.use_float_samples:
-                yvals = [-1., 1.]
-            else:
-                yvals = [-1, 1]
-            while True:
-                yield yvals[0]
-                yield yvals[1]
-        t = self.in_periods
-        a = np.zeros(160, dtype=self.dtype)
-        y_iter = iter_yvals()
-        y = next(y_iter)
-        i = 0
-        for v in data:
-            a[i] = y
-            if v:
-                y = next(y_iter)
-            a[i+1] = y
-            y = next(y_iter)
-            i += 2
-        a = np.repeat(a, self.in_periods.size / 160)
-        if not self.use_float_samples:
-            y_max = int(self.y_max / 2)
-            a *= y_max
-        return self.resample(a)
+        self.template = kwargs.get('template')
+        if self.template is None:
+            self.template = BiphaseTemplate.get_template(
+                sample_rate=self.out_sample_rate,
+                frame_rate=1,
+                bit_depth=self.bit_depth,
+                use_float_samples=self.use_float_samples,
+                dtype=self.dtype,
+            )
+    def generate_samples(self, data, num_samples=None):
+        if num_samples is None:
+            num_samples = self.out_sample_rate
+        return self.template.render(data, num_samples)
+
+DATABLOCK_DTYPE = np.dtype([
+    ('data', bool, (80,)),
+    ('start_sample', np.int64),
+    ('end_sample', np.int64),
+])
+
+SYNC_WORD = np.array([False, False] + [True] * 12 + [False, True])
 
 class ZeroCrossLocator(object):
     def __init__(self, **kwargs):
         self.last_sample = None
+        self.sample_index = 0
     def detect(self, samples):
-        if self.last_sample is not None:
-            samples = np.concatenate((self.last_sample, samples))
-        self.last_sample = samples[-1:]
-        lo = np.sign(samples)
-        lo[lo==0] = -1
-        return np.where(np.diff(lo))[0]
+        positive = np.asarray(samples) > 0
+        if not positive.size:
+            return np.empty(0, dtype=np.int64)
+        ix = np.flatnonzero(positive[1:] != positive[:-1]) + 1
+        if self.last_sample is not None and positive[0] != self.last_sample:
+            ix = np.concatenate(([0], ix))
+        ix = ix.astype(np.int64) + self.sample_index
+        self.last_sample = positive[-1]
+        self.sample_index += positive.size
+        return ix
 
 class LTCDataBlockDecoder(ZeroCrossLocator):
+    tracking_block_size = 32
+    tracking_rate = .05
+    max_unlocked_intervals = 16
     def __init__(self, **kwargs):
         super(LTCDataBlockDecoder, self).__init__(**kwargs)
         self.datablock_callback = kwargs.get('datablock_callback')
-        self.data_buffer = []
-        self.consec_ones = 0
-        self.current_index = 0
-        self.syncword_index = None
+        self.frame_format = kwargs.get('frame_format')
+        self.half_bit_period = None
+        sample_rate = kwargs.get('sample_rate')
+        frame_rate = kwargs.get('frame_rate')
+        if sample_rate is not None and frame_rate is not None:
+            self.half_bit_period = float(sample_rate / frame_rate / 160)
+        self.transitions = np.empty(0, dtype=np.int64)
+        self.recent_intervals = np.empty(0, dtype=np.int64)
+        self.unlocked_intervals = 0
+        a = self.tracking_rate
+        self._tracking_weights = a * (1. - a) ** np.arange(self.tracking_block_size - 1, -1, -1)
+        self.pending_short = None
+        self.bits = np.empty(0, dtype=bool)
+        self.bit_starts = np.empty(0, dtype=np.int64)
+        self.bit_ends = np.empty(0, dtype=np.int64)
+    def estimate_half_bit_period(self, intervals):
+        if intervals.size < 16:
+            return None
+        threshold = (intervals.min() + intervals.max()) / 2.
+        is_short = intervals < threshold
+        if intervals.max() < intervals.min() * 1.5:
+            return None
+        return np.where(is_short, intervals, intervals / 2.).mean()
+    def track_half_bit_period(self, normalized):
+        n = normalized.size
+        if not n:
+            return
+        a = self.tracking_rate
+        weights = self._tracking_weights[-n:]
+        T = self.half_bit_period * (1. - a) ** n + np.dot(weights, normalized)
+        self.half_bit_period = T
+    def classify(self, intervals):
+        is_short = np.zeros(intervals.size, dtype=bool)
+        is_long = np.zeros(intervals.size, dtype=bool)
+        divisor = np.ones(intervals.size)
+        bs = self.tracking_block_size
+        for i in range(0, intervals.size, bs):
+            d = intervals[i:i+bs]
+            T = self.half_bit_period
+            if T is None:
+                recent = np.concatenate((self.recent_intervals, intervals[:i+bs]))
+                T = self.half_bit_period = self.estimate_half_bit_period(recent[-64:])
+                if T is None:
+                    continue
+            short = is_short[i:i+bs]
+            long = is_long[i:i+bs]
+            np.less(d, T * 1.5, out=short)
+            short &= d > T * .5
+            np.greater_equal(d, T * 1.5, out=long)
+            long &= d < T * 2.5
+            valid = short | long
+            num_valid = np.count_nonzero(valid)
+            if num_valid >= d.size - num_valid:
+                self.unlocked_intervals = 0
+            else:
+                self.unlocked_intervals += d.size - num_valid
+                if self.unlocked_intervals >= self.max_unlocked_intervals:
+                    self.half_bit_period = None
+                    self.unlocked_intervals = 0
+                    continue
+            divisor[i:i+bs][long] = 2.
+            self.track_half_bit_period(d[valid] / divisor[i:i+bs][valid])
+        self.recent_intervals = np.concatenate((self.recent_intervals, intervals[-64:]))[-64:]
+        return is_short, is_long
     def iter_decode(self, samples):
-        transitions = self.detect(samples)
-        diff = np.diff(transitions)
-        dmin = diff[1:].min()
-        minrange = list(range(dmin-2, dmin+3))
-        dmax = diff.max()
-        maxrange = list(range(dmax-2, dmax+3))
-        diff_iter = np.nditer(diff)
-        while True:
-            if diff_iter.finished:
-                break
-            v = diff_iter[0]
-            if v in minrange:
-                diff_iter.iternext()
-                yield True
-            elif v in maxrange:
-                yield False
-            diff_iter.iternext()
+        for value in self.decode_bits(samples)[0]:
+            yield value
+    def decode_bits(self, samples):
+        positions = np.concatenate((self.transitions, self.detect(samples)))
+        empty = np.empty(0, dtype=np.int64)
+        if positions.size < 2:
+            self.transitions = positions
+            return np.empty(0, dtype=bool), empty, empty
+        intervals = np.diff(positions)
+        self.transitions = positions[-1:]
+
+        is_short, is_long = self.classify(intervals)
+
+        # Position of each short interval within its run of shorts. A '1'
+        # bit is emitted on every second short of a run.
+        count = np.cumsum(is_short)
+        run_start = np.where(is_short, 0, count)
+        np.maximum.accumulate(run_start, out=run_start)
+        run_pos = count - run_start
+        if self.pending_short is not None:
+            first_reset = np.argmin(is_short) if not is_short.all() else is_short.size
+            run_pos[:first_reset] += 1
+        is_one = is_short & (run_pos % 2 == 0)
+        emit = is_one | is_long
+
+        prev_positions = np.empty_like(positions[:-1])
+        prev_positions[1:] = positions[:-2]
+        if self.pending_short is not None:
+            prev_positions[0] = self.pending_short
+        else:
+            prev_positions[0] = positions[0]
+        bit_starts = np.where(is_one, prev_positions, positions[:-1])[emit]
+        bit_ends = positions[1:][emit]
+
+        if is_short[-1] and run_pos[-1] % 2 == 1:
+            self.pending_short = positions[-2]
+        else:
+            self.pending_short = None
+        return is_one[emit], bit_starts, bit_ends
     def decode(self, samples):
-        bfr = self.data_buffer
-        i = self.current_index
-        consec_ones = self.consec_ones
-        syncword_index = self.syncword_index
-        for value in self.iter_decode(samples):
-            if value:
-                consec_ones += 1
-            else:
-                consec_ones = 0
-            bfr.append(value)
-            if consec_ones == 12 and syncword_index is None:
-                syncword_index = i + 2
-            if i == syncword_index:
-                if len(bfr) >= 80:
-                    datablock = bfr[-80:]
-                    self.on_datablock(datablock)
-                    syncword_index = None
-                    i = 0
-                    bfr = []
-                else:
-                    syncword_index = None
-            i += 1
-        self.consec_ones = consec_ones
-        self.current_index = i
-        self.syncword_index = syncword_index
-        self.data_buffer = bfr
+        bits, bit_starts, bit_ends = self.decode_bits(samples)
+        tail_size = self.bits.size
+        bits = np.concatenate((self.bits, bits))
+        bit_starts = np.concatenate((self.bit_starts, bit_starts))
+        bit_ends = np.concatenate((self.bit_ends, bit_ends))
+        self.bits = bits[-79:]
+        self.bit_starts = bit_starts[-79:]
+        self.bit_ends = bit_ends[-79:]
+
+        first = max(79, tail_size)
+        if bits.size <= first:
+            return np.empty(0, dtype=DATABLOCK_DTYPE)
+        match = np.ones(bits.size - first, dtype=bool)
+        for i, v in enumerate(SYNC_WORD):
+            match &= bits[first-15+i:bits.size-15+i] == v
+        ends = np.flatnonzero(match) + first
+        blocks = np.empty(ends.size, dtype=DATABLOCK_DTYPE)
+        blocks['data'] = bits[ends[:, np.newaxis] + np.arange(-79, 1)]
+        blocks['start_sample'] = bit_starts[ends - 79]
+        blocks['end_sample'] = bit_ends[ends]
+        for datablock in blocks['data']:
+            self.on_datablock(datablock)
+        return blocks
+    def decode_timecodes(self, samples):
+        blocks = self.decode(samples)
+        return blocks, decode_datablocks(blocks['data'], self.frame_format)
     def on_datablock(self, datablock):
         if self.datablock_callback is not None:
             self.datablock_callback(datablock)
@@ -3,13 +3,22 @@ import numpy as np
 class Field(object):
     start_bit = None
     bit_length = 1
+    source = None
+    divisor = 1
+    modulus = None
+    default_value = 0
     def __init__(self, **kwargs):
         self.generator = kwargs.get('generator')
-        self._value = kwargs.get('value', 0)
+        self.block = kwargs.get('block')
+        self._value = kwargs.get('value', self.default_value)
     @classmethod
     def iter_subclasses(cls):
         for _cls in cls.__subclasses__():
-            yield _cls
+            if _cls.start_bit is None:
+                for _subcls in _cls.iter_subclasses():
+                    yield _subcls
+            else:
+                yield _cls
     @property
     def value(self):
         return self.get_value()
@@ -27,6 +36,8 @@ class Field(object):
         return self._value
     def set_value(self, value):
         self._value = value
+        if self.block is not None:
+            self.block.on_field_changed(self)
     def __repr__(self):
         return '{self.__class__.__name__}: {self.value}'.format(self=self)
     def __str__(self):
@@ -35,53 +46,70 @@ class Field(object):
 class FrameUnits(Field):
     start_bit = 0
     bit_length = 4
+    source = 'frames'
+    modulus = 10
     def get_value(self):
         return self.generator.frame.value % 10
 
 class FrameTens(Field):
     start_bit = 8
     bit_length = 2
+    source = 'frames'
+    divisor = 10
     def get_value(self):
         return self.generator.frame.value // 10
 
 class SecondUnits(Field):
     start_bit = 16
     bit_length = 4
+    source = 'seconds'
+    modulus = 10
     def get_value(self):
         return self.generator.frame.second.value % 10
 
 class SecondTens(Field):
     start_bit = 24
     bit_length = 3
+    source = 'seconds'
+    divisor = 10
     def get_value(self):
         return self.generator.frame.second.value // 10
 
 class MinuteUnits(Field):
     start_bit = 32
     bit_length = 4
+    source = 'minutes'
+    modulus = 10
     def get_value(self):
         return self.generator.frame.minute.value % 10
 
 class MinuteTens(Field):
     start_bit = 40
     bit_length = 3
+    source = 'minutes'
+    divisor = 10
     def get_value(self):
         return self.generator.frame.minute.value // 10
 
 class HourUnits(Field):
     start_bit = 48
     bit_length = 4
+    source = 'hours'
+    modulus = 10
     def get_value(self):
         return self.generator.frame.hour.value % 10
 
 class HourTens(Field):
     start_bit = 56
     bit_length = 2
+    source = 'hours'
+    divisor = 10
     def get_value(self):
         return self.generator.frame.hour.value // 10
 
 class DropFlag(Field):
     start_bit = 10
+    source = 'drop_frame'
     def __init__(self, **kwargs):
         super(DropFlag, self).__init__(**kwargs)
         if self.generator.frame_format.drop_frame:
@@ -89,49 +117,298 @@ class DropFlag(Field):
 
 class ColorFrameFlag(Field):
     start_bit = 11
-    def __init__(self, **kwargs):
-        super(ColorFrameFlag, self).__init__(**kwargs)
-        self._value = 1
+    source = 'color_frame'
+    default_value = 1
 
 class ParityBit(Field):
     start_bit = 27
 
 class BinaryGroupLSB(Field):
     start_bit = 43
+    source = 'binary_group_lsb'
 
 class BinaryGroupMSB(Field):
     start_bit = 59
+    source = 'binary_group_msb'
+
+class BinaryGroup(Field):
+    bit_length = 4
+    source = 'user_bits'
+    modulus = 0x10
+
+class BinaryGroup1(BinaryGroup):
+    start_bit = 4
+
+class BinaryGroup2(BinaryGroup):
+    start_bit = 12
+    divisor = 0x10
+
+class BinaryGroup3(BinaryGroup):
+    start_bit = 20
+    divisor = 0x100
+
+class BinaryGroup4(BinaryGroup):
+    start_bit = 28
+    divisor = 0x1000
+
+class BinaryGroup5(BinaryGroup):
+    start_bit = 36
+    divisor = 0x10000
+
+class BinaryGroup6(BinaryGroup):
+    start_bit = 44
+    divisor = 0x100000
+
+class BinaryGroup7(BinaryGroup):
+    start_bit = 52
+    divisor = 0x1000000
+
+class BinaryGroup8(BinaryGroup):
+    start_bit = 60
+    divisor = 0x10000000
 
 class SyncWord(Field):
     start_bit = 64
     bit_length = 16
-    def __init__(self, **kwargs):
-        super(SyncWord, self).__init__(**kwargs)
-        self._value = 0xBFFC
+    default_value = 0xBFFC
+
+class FieldSchema(object):
+    def __init__(self, field_classes):
+        self.field_classes = sorted(field_classes, key=lambda cls: cls.start_bit)
+        self.bit_shifts = {
+            cls:np.arange(cls.bit_length) for cls in self.field_classes
+        }
+    def get_fields(self, source):
+        return [cls for cls in self.field_classes if cls.source == source]
+    def get_source_field(self, source, divisor=1):
+        for cls in self.get_fields(source):
+            if cls.divisor == divisor:
+                return cls
+    def get_field_value(self, cls, values):
+        if cls.source not in values:
+            return cls.default_value
+        v = values[cls.source] // cls.divisor
+        if cls.modulus is not None:
+            v = v % cls.modulus
+        return v
+    def pack(self, **kwargs):
+        values = {k:np.asarray(v, dtype=np.int64) for k, v in kwargs.items()}
+        shape = np.broadcast(*values.values()).shape if len(values) else ()
+        data = np.zeros(shape + (80,), dtype=bool)
+        for cls in self.field_classes:
+            if cls is ParityBit:
+                continue
+            v = np.asarray(self.get_field_value(cls, values), dtype=np.int64)
+            start = cls.start_bit
+            shifts = self.bit_shifts[cls]
+            data[..., start:start+cls.bit_length] = (v[..., np.newaxis] >> shifts) & 1
+        data[..., ParityBit.start_bit] = np.count_nonzero(data, axis=-1) % 2 == 1
+        return data
+    def pack_value(self, **kwargs):
+        v = 0
+        for cls in self.field_classes:
+            if cls is ParityBit:
+                continue
+            fv = int(self.get_field_value(cls, kwargs))
+            v |= (fv & ((1 << cls.bit_length) - 1)) << cls.start_bit
+        if bin(v).count('1') % 2 == 1:
+            v |= 1 << ParityBit.start_bit
+        return v
+
+DATABLOCK_SCHEMA = FieldSchema(Field.iter_subclasses())
+
+def pack_datablocks(**kwargs):
+    return DATABLOCK_SCHEMA.pack(**kwargs)
+
+class DigitPair(object):
+    def __init__(self, source, schema=DATABLOCK_SCHEMA):
+        self.source = source
+        tens_cls = self.tens_cls = schema.get_source_field(source, 10)
+        units_cls = self.units_cls = schema.get_source_field(source, 1)
+        self.tens_slice = slice(tens_cls.start_bit, tens_cls.start_bit + tens_cls.bit_length)
+        self.units_slice = slice(units_cls.start_bit, units_cls.start_bit + units_cls.bit_length)
+        self.tens_bits = build_bit_table(tens_cls.bit_length)
+        self.units_bits = build_bit_table(units_cls.bit_length)
+        tens_mask = (1 << tens_cls.bit_length) - 1
+        packed = []
+        for v in range(100):
+            tens, units = divmod(v, 10)
+            packed.append(
+                ((tens & tens_mask) << tens_cls.start_bit) | (units << units_cls.start_bit)
+            )
+        self.packed = tuple(packed)
+        self.ones = tuple(bin(v).count('1') for v in packed)
+
+def build_bit_table(bit_length, count=10):
+    weights = 1 << np.arange(bit_length)
+    table = (np.arange(count)[:, np.newaxis] & weights) != 0
+    table.flags.writeable = False
+    return table
+
+DIGIT_PAIRS = tuple(
+    DigitPair(source) for source in ['hours', 'minutes', 'seconds', 'frames']
+)
+
+NIBBLE_BITS = build_bit_table(4, 16)
+NIBBLE_ONES = tuple(bin(v).count('1') for v in range(16))
 
 class LTCDataBlock(object):
+    schema = DATABLOCK_SCHEMA
     def __init__(self, **kwargs):
         self.generator = kwargs.get('generator')
         self.fields = {}
-        for cls in Field.iter_subclasses():
-            field = cls(generator=self.generator)
+        for cls in self.schema.field_classes:
+            field = cls(generator=self.generator, block=self)
             self.fields[cls.__name__] = field
-    def get_value(self):
+        self.user_bits_fields = [
+            self.fields[cls.__name__] for cls in self.schema.get_fields('user_bits')
+        ]
+        dynamic_classes = set([ParityBit])
+        for pair in DIGIT_PAIRS:
+            dynamic_classes.update([pair.tens_cls, pair.units_cls])
+        dynamic_classes.update([f.__class__ for f in self.user_bits_fields])
+        self.static_fields = [
+            f for f in self.schema_fields() if f.__class__ not in dynamic_classes
+        ]
+        self._array = np.zeros(80, dtype=bool)
+        self.build_static()
+    def build_static(self):
+        a = self._array
+        a[:] = False
         v = 0
-        for field in self.fields.values():
-            v += field.get_block_value()
+        for field in self.static_fields:
+            v |= field.get_block_value()
+            field.set_array(a)
+        self._value = v
+        self._ones = bin(v).count('1')
+        self._hmsf = (0, 0, 0, 0)
+        self._user_bits = 0
+        a[ParityBit.start_bit] = self._ones & 1
+        self.set_user_bits(self.get_field_user_bits())
+    def schema_fields(self):
+        return [self.fields[cls.__name__] for cls in self.schema.field_classes]
+    def get_static_values(self):
+        values = {'user_bits':self._user_bits}
+        for field in self.static_fields:
+            cls = field.__class__
+            if cls.source is None:
+                continue
+            values.setdefault(cls.source, 0)
+            values[cls.source] += field.value * cls.divisor
+        return values
+    def get_field_user_bits(self):
+        v = 0
+        for field in self.user_bits_fields:
+            v += (field._value & 0xF) * field.divisor
         return v
+    @property
+    def user_bits(self):
+        return self._user_bits
+    @user_bits.setter
+    def user_bits(self, value):
+        self.set_user_bits(value)
+    def set_user_bits(self, value):
+        value = int(value) & 0xFFFFFFFF
+        last_value = self._user_bits
+        if value == last_value:
+            return
+        v = self._value
+        ones = self._ones
+        a = self._array
+        for field in self.user_bits_fields:
+            cls = field.__class__
+            nibble = (value // cls.divisor) & 0xF
+            last_nibble = (last_value // cls.divisor) & 0xF
+            field._value = nibble
+            if nibble == last_nibble:
+                continue
+            v ^= (nibble ^ last_nibble) << cls.start_bit
+            ones += NIBBLE_ONES[nibble] - NIBBLE_ONES[last_nibble]
+            a[cls.start_bit:cls.start_bit+4] = NIBBLE_BITS[nibble]
+        a[ParityBit.start_bit] = ones & 1
+        self._value = v
+        self._ones = ones
+        self._user_bits = value
+    def on_field_changed(self, field):
+        if field in self.user_bits_fields:
+            self.set_user_bits(self.get_field_user_bits())
+        elif field in self.static_fields:
+            self.build_static()
+    def update(self):
+        hmsf = self.generator.frame.timecode.get_hmsf_values()
+        last_hmsf = self._hmsf
+        if hmsf == last_hmsf:
+            return
+        tens_units = self.generator.frame_format.tens_units
+        v = self._value
+        ones = self._ones
+        a = self._array
+        for pair, value, last_value in zip(DIGIT_PAIRS, hmsf, last_hmsf):
+            if value == last_value:
+                continue
+            v ^= pair.packed[last_value] ^ pair.packed[value]
+            ones += pair.ones[value] - pair.ones[last_value]
+            tens, units = tens_units[value]
+            a[pair.tens_slice] = pair.tens_bits[tens]
+            a[pair.units_slice] = pair.units_bits[units]
+        a[ParityBit.start_bit] = ones & 1
+        self._value = v
+        self._ones = ones
+        self._hmsf = hmsf
+    def get_value(self):
+        self.update()
+        return self._value | ((self._ones & 1) << ParityBit.start_bit)
     def get_string(self):
-        v = self.get_value()
-        s = bin(v)
-        if s.count('0') % 2 == 1:
-            v += 1 << ParityBit.start_bit
-            s = bin(v)
-        return s[2:]
-    def get_array(self):
-        a = np.zeros(80, dtype=bool)
-        for field in self.fields.values():
-            field.set_array(a)
-        if np.count_nonzero(a) % 2 == 1:
-            a[ParityBit.start_bit] = True
-        return a
+        return bin(self.get_value())[2:]
+    def get_array(self, copy=True):
+        self.update()
+        if not copy:
+            return self._array
+        return self._array.copy()
+    def get_arrays(self, total_frames, user_bits=None):
+        h, m, s, f = self.generator.frame_format.total_frames_to_hmsf(np.asarray(total_frames))
+        values = self.get_static_values()
+        if user_bits is not None:
+            values['user_bits'] = user_bits
+        return self.schema.pack(hours=h, minutes=m, seconds=s, frames=f, **values)
+
+TIMECODE_DTYPE = np.dtype([
+    ('hours', np.int32),
+    ('minutes', np.int32),
+    ('seconds', np.int32),
+    ('frames', np.int32),
+    ('total_frames', np.int64),
+    ('drop_frame', bool),
+    ('color_frame', bool),
+    ('user_bits', np.uint32),
+    ('parity_valid', bool),
+])
+
+def get_field_values(data, field_cls):
+    start = field_cls.start_bit
+    weights = 1 << np.arange(field_cls.bit_length)
+    return np.dot(data[:, start:start+field_cls.bit_length], weights)
+
+def decode_datablocks(data, frame_format=None):
+    data = np.asarray(data, dtype=bool).reshape(-1, 80)
+    result = np.zeros(data.shape[0], dtype=TIMECODE_DTYPE)
+    values = {}
+    for cls in DATABLOCK_SCHEMA.field_classes:
+        if cls.source not in TIMECODE_DTYPE.names:
+            continue
+        v = get_field_values(data, cls).astype(np.int64) * cls.divisor
+        if cls.source in values:
+            values[cls.source] += v
+        else:
+            values[cls.source] = v
+    for key, v in values.items():
+        result[key] = v
+    result['parity_valid'] = np.count_nonzero(data, axis=1) % 2 == 0
+    if frame_format is None:
+        result['total_frames'] = -1
+    else:
+        result['total_frames'] = frame_format.calc_total_frames(
+            result['hours'].astype(np.int64), result['minutes'],
+            result['seconds'], result['frames'],
+        )
+    return result
@@ -1,7 +1,30 @@
 import numbers
 import operator
+import time
 from fractions import Fraction
 
+try:
+    from time import monotonic_ns, time_ns
+except ImportError: # pragma: no cover
+    _monotonic = getattr(time, 'monotonic', time.time)
+    def monotonic_ns():
+        return int(_monotonic() * 1e9)
+    def time_ns():
+        return int(time.time() * 1e9)
+
+class _LazyModule(object):
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+    def __getattr__(self, attr):
+        module = self._module
+        if module is None:
+            import importlib
+            module = self._module = importlib.import_module(self._name)
+        return getattr(module, attr)
+
+np = _LazyModule('numpy')
+
 class FrameRate(object):
     defaults = {
         24:(24, 1),
@@ -13,13 +36,20 @@ class FrameRate(object):
     }
     _registry = {}
     def __new__(cls, numerator, denom=1):
+        obj = cls._registry.get((numerator, denom))
+        if obj is not None:
+            return obj
         key = Fraction(numerator, denom)
-        if key in cls._registry:
-            return cls._registry[key]
-        obj = super(FrameRate, cls).__new__(cls)
-        cls._registry[key] = obj
+        obj = cls._registry.get(key)
+        if obj is None:
+            obj = super(FrameRate, cls).__new__(cls)
+            obj._build(key.numerator, key.denominator)
+            cls._registry[key] = obj
+        cls._registry[(numerator, denom)] = obj
         return obj
     def __init__(self, numerator, denom=1):
+        pass
+    def _build(self, numerator, denom):
         self.__numerator = numerator
         self.__denom = denom
         self.__value = Fraction(numerator, denom)
@@ -27,7 +57,11 @@ class FrameRate(object):
         if self.denom == 1:
             self.__rounded = self.numerator
         else:
-            self.__rounded = round(self.value)
+            self.__rounded = int(round(self.value))
+        self.__frames_per_minute = numerator * 60 // denom
+        self.__frames_per_ten_minutes = numerator * 600 // denom
+    def __reduce__(self):
+        return (self.__class__, (self.numerator, self.denom))
     @classmethod
     def from_float(cls, value):
         if value not in cls.defaults:
@@ -49,6 +83,12 @@ class FrameRate(object):
     @property
     def rounded(self):
         return self.__rounded
+    @property
+    def frames_per_minute(self):
+        return self.__frames_per_minute
+    @property
+    def frames_per_ten_minutes(self):
+        return self.__frames_per_ten_minutes
     def _coerce_value(self, other):
         if isinstance(other, FrameRate):
             return other.value
@@ -64,22 +104,36 @@ class FrameRate(object):
         return op(self.value, other)
     def _rcoerce_op(self, other, op):
         return self._coerce_op(other, op, reverse_op=True)
-    def __eq__(self, other): return self._coerce_op(other, operator.eq)
-    def __ne__(self, other): return self._coerce_op(other, operator.ne)
-    def __lt__(self, other): return self._coerce_op(other, operator.lt)
-    def __le__(self, other): return self._coerce_op(other, operator.le)
-    def __gt__(self, other): return self._coerce_op(other, operator.gt)
-    def __ge__(self, other): return self._coerce_op(other, operator.ge)
-    def __mul__(self, other): return self._coerce_op(other, operator.mul)
-    def __rmul__(self, other): return self._rcoerce_op(other, operator.mul)
+    def _compare(self, other, op):
+        if isinstance(other, FrameRate):
+            return op(self.__numerator * other.denom, other.numerator * self.__denom)
+        elif isinstance(other, numbers.Integral):
+            return op(self.__numerator, other * self.__denom)
+        return self._coerce_op(other, op)
+    def _int_op(self, other, op, reverse_op=False):
+        if self.__denom == 1 and isinstance(other, numbers.Integral):
+            if reverse_op:
+                return op(other, self.__numerator)
+            return op(self.__numerator, other)
+        return self._coerce_op(other, op, reverse_op)
+    def __eq__(self, other): return self._compare(other, operator.eq)
+    def __ne__(self, other): return self._compare(other, operator.ne)
+    def __lt__(self, other): return self._compare(other, operator.lt)
+    def __le__(self, other): return self._compare(other, operator.le)
+    def __gt__(self, other): return self._compare(other, operator.gt)
+    def __ge__(self, other): return self._compare(other, operator.ge)
+    def __hash__(self):
+        return hash(self.__value)
+    def __mul__(self, other): return self._int_op(other, operator.mul)
+    def __rmul__(self, other): return self._int_op(other, operator.mul, True)
     def __div__(self, other): return self._coerce_op(other, operator.div)
     def __rdiv__(self, other): return self._rcoerce_op(other, operator.div)
     def __truediv__(self, other): return self._coerce_op(other, operator.truediv)
     def __rtruediv__(self, other): return self._rcoerce_op(other, operator.truediv)
-    def __floordiv__(self, other): return self._coerce_op(other, operator.floordiv)
-    def __rfloordiv__(self, other): return self._rcoerce_op(other, operator.floordiv)
-    def __mod__(self, other): return self._coerce_op(other, operator.mod)
-    def __rmod__(self, other): return self._rcoerce_op(other, operator.mod)
+    def __floordiv__(self, other): return self._int_op(other, operator.floordiv)
+    def __rfloordiv__(self, other): return self._int_op(other, operator.floordiv, True)
+    def __mod__(self, other): return self._int_op(other, operator.mod)
+    def __rmod__(self, other): return self._int_op(other, operator.mod, True)
     def __repr__(self):
         return '<FrameRate: {self} ({self.numerator}/{self.denom})>'.format(self=self)
     def __str__(self):
@@ -88,12 +142,50 @@ class FrameRate(object):
         return '{:05.2f}'.format(self.float_value)
 
 class FrameFormat(object):
-    def __init__(self, **kwargs):
-        rate = kwargs.get('rate')
-        if isinstance(rate, numbers.Number):
+    _registry = {}
+    def __new__(cls, rate=None, drop_frame=False, **kwargs):
+        drop_frame = bool(drop_frame)
+        if isinstance(rate, FrameRate):
+            key = (rate.value, drop_frame)
+        else:
+            key = (rate, drop_frame)
+        obj = cls._registry.get(key)
+        if obj is not None:
+            return obj
+        if not isinstance(rate, FrameRate):
             rate = FrameRate.from_float(rate)
+        rate_key = (rate.value, drop_frame)
+        obj = cls._registry.get(rate_key)
+        if obj is None:
+            obj = super(FrameFormat, cls).__new__(cls)
+            obj._build_tables(rate, drop_frame)
+            cls._registry[rate_key] = obj
+        cls._registry[key] = obj
+        return obj
+    def __init__(self, rate=None, drop_frame=False, **kwargs):
+        pass
+    def _build_tables(self, rate, drop_frame):
         self.rate = rate
-        self.drop_frame = kwargs.get('drop_frame')
+        self.drop_frame = drop_frame
+        self._key = (rate.value, drop_frame)
+        fps = self.frames_per_second = rate.rounded
+        if fps == 30:
+            self.df_frame_numbers = (0, 1)
+        elif fps == 60:
+            self.df_frame_numbers = (0, 1, 2, 3)
+        else:
+            self.df_frame_numbers = ()
+        if drop_frame:
+            self.drop_count = len(self.df_frame_numbers)
+        else:
+            self.drop_count = 0
+        self.frames_per_minute = fps * 60 - self.drop_count
+        self.drops_per_ten_minutes = self.drop_count * 9
+        self.frames_per_ten_minutes = fps * 600 - self.drops_per_ten_minutes
+        self.frames_per_hour = self.frames_per_ten_minutes * 6
+        self.frames_per_day = self.frames_per_hour * 24
+        self.frame_times = tuple(i / rate.float_value for i in range(fps))
+        self.tens_units = tuple(divmod(v, 10) for v in range(100))
         tc_fmt = ':'.join(['{:02d}'] * 3)
         if self.drop_frame:
             f_delim = ';'
@@ -102,16 +194,50 @@ class FrameFormat(object):
         self.tc_fmt_str = f_delim.join([tc_fmt, '{:02d}'])
     def format_tc_string(self, hmsf):
         return self.tc_fmt_str.format(*hmsf)
+    def nanoseconds_to_frame(self, nanoseconds):
+        fr = self.rate
+        scale = fr.denom * 1000000000
+        # Nearest frame start within the second, ties going to the earlier frame
+        frame = -((scale - 2 * nanoseconds * fr.numerator) // (2 * scale))
+        return min(frame, self.frames_per_second - 1)
+    def microseconds_to_frame(self, microseconds):
+        return self.nanoseconds_to_frame(microseconds * 1000)
+    def calc_total_frames(self, hours, minutes, seconds, frames):
+        fps = self.frames_per_second
+        total_frames = (hours * 3600 + minutes * 60 + seconds) * fps + frames
+        if self.drop_count:
+            total_minutes = 60 * hours + minutes
+            total_frames -= self.drop_count * (total_minutes - total_minutes // 10)
+        return total_frames
+    def total_frames_to_hmsf(self, total_frames):
+        fps = self.frames_per_second
+        drop_count = self.drop_count
+        if drop_count:
+            D, M = divmod(total_frames, self.frames_per_ten_minutes)
+            add_frames = self.drops_per_ten_minutes * D
+            add_frames += drop_count * ((M - drop_count) // self.frames_per_minute) * (M >= drop_count)
+            total_frames = total_frames + add_frames
+        seconds = total_frames // fps
+        return (
+            (seconds // 3600) % 24,
+            (seconds // 60) % 60,
+            seconds % 60,
+            total_frames % fps,
+        )
     def __eq__(self, other):
         if not isinstance(other, FrameFormat):
             return NotImplemented
-        if self.drop_frame is not other.drop_frame:
-            return False
-        return self.rate == other.rate
+        if self is other:
+            return True
+        return self._key == other._key
     def __ne__(self, other):
         if not isinstance(other, FrameFormat):
             return NotImplemented
         return not self.__eq__(other)
+    def __hash__(self):
+        return hash(self._key)
+    def __reduce__(self):
+        return (self.__class__, (self.rate, self.drop_frame))
     def __repr__(self):
         return '{self.__class__.__name__}: {self}'.format(self=self)
     def __str__(self):
@@ -121,172 +247,380 @@ class FrameFormat(object):
             s = 'Non-Drop'
         return '{}fps ({})'.format(self.rate, s)
 
+class WallClock(object):
+    day_ns = 86400 * 1000000000
+    check_interval = 900
+    def __init__(self, **kwargs):
+        self.frame_format = kwargs.get('frame_format')
+        self.use_utc = kwargs.get('use_utc', False)
+        self.sync()
+    def sync(self, ts_ns=None):
+        mono_ns = monotonic_ns()
+        now_ns = time_ns()
+        if ts_ns is None:
+            ts_ns = now_ns
+        ts = ts_ns // 1000000000
+        if self.use_utc:
+            tm = time.gmtime(ts)
+        else:
+            tm = time.localtime(ts)
+        seconds = tm.tm_hour * 3600 + tm.tm_min * 60 + tm.tm_sec
+        self.midnight_ns = (ts - seconds) * 1000000000
+        self.monotonic_offset_ns = now_ns - mono_ns
+        start_ns = self.midnight_ns
+        end_ns = start_ns + self.day_ns
+        if not self.use_utc:
+            # UTC offset changes fall on quarter-hour boundaries
+            check_ns = (ts - ts % self.check_interval) * 1000000000
+            start_ns = max(start_ns, check_ns)
+            end_ns = min(end_ns, check_ns + self.check_interval * 1000000000)
+        self.sync_start_ns = start_ns
+        self.sync_end_ns = end_ns
+    def ns_to_total_frames(self, ts_ns):
+        if not self.sync_start_ns <= ts_ns < self.sync_end_ns:
+            self.sync(ts_ns)
+        ns = ts_ns - self.midnight_ns
+        seconds, ns = divmod(ns, 1000000000)
+        fmt = self.frame_format
+        f = fmt.nanoseconds_to_frame(ns)
+        s = seconds % 60
+        m = (seconds // 60) % 60
+        if fmt.drop_frame and s == 0 and m % 10 != 0 and f in fmt.df_frame_numbers:
+            f = fmt.df_frame_numbers[-1] + 1
+        return fmt.calc_total_frames(seconds // 3600, m, s, f)
+    def timestamp_to_total_frames(self, ts):
+        return self.ns_to_total_frames(int(round(ts * 1e9)))
+    def total_frames_to_ns(self, total_frames):
+        fmt = self.frame_format
+        days, total_frames = divmod(total_frames, fmt.frames_per_day)
+        h, m, s, f = fmt.total_frames_to_hmsf(total_frames)
+        seconds = days * 86400 + h * 3600 + m * 60 + s
+        fr = fmt.rate
+        ns = f * fr.denom * 1000000000 // fr.numerator
+        return self.midnight_ns + seconds * 1000000000 + ns
+    def monotonic_to_total_frames(self, mono_ns):
+        return self.ns_to_total_frames(mono_ns + self.monotonic_offset_ns)
+    def get_total_frames(self):
+        return self.monotonic_to_total_frames(monotonic_ns())
+
+class Timecode(object):
+    __slots__ = ('__total_frames', '__frame_format', '__hmsf')
+    def __init__(self, total_frames, frame_format):
+        self.__total_frames = int(total_frames)
+        self.__frame_format = frame_format
+        self.__hmsf = None
+    @classmethod
+    def from_hmsf(cls, frame_format, hours=0, minutes=0, seconds=0, frames=0):
+        total_frames = frame_format.calc_total_frames(hours, minutes, seconds, frames)
+        return cls(total_frames, frame_format)
+    @property
+    def total_frames(self):
+        return self.__total_frames
+    @property
+    def frame_format(self):
+        return self.__frame_format
+    @property
+    def hours(self):
+        return self.get_hmsf_values()[0]
+    @property
+    def minutes(self):
+        return self.get_hmsf_values()[1]
+    @property
+    def seconds(self):
+        return self.get_hmsf_values()[2]
+    @property
+    def frames(self):
+        return self.get_hmsf_values()[3]
+    def get_hmsf_values(self):
+        hmsf = self.__hmsf
+        if hmsf is None:
+            hmsf = self.frame_format.total_frames_to_hmsf(self.__total_frames)
+            self.__hmsf = hmsf
+        return hmsf
+    def get_tc_string(self):
+        return self.frame_format.format_tc_string(self.get_hmsf_values())
+    def _coerce_value(self, other):
+        if isinstance(other, (Timecode, Frame)):
+            if self.frame_format != other.frame_format:
+                return NotImplemented
+            return other.total_frames
+        if isinstance(other, numbers.Integral):
+            return other
+        return NotImplemented
+    def _coerce_op(self, other, op):
+        other = self._coerce_value(other)
+        if other is NotImplemented:
+            return NotImplemented
+        return Timecode(op(self.__total_frames, other), self.__frame_format)
+    def _coerce_cmp(self, other, op):
+        other = self._coerce_value(other)
+        if other is NotImplemented:
+            return NotImplemented
+        return op(self.__total_frames, other)
+    def __add__(self, other): return self._coerce_op(other, operator.add)
+    def __radd__(self, other): return self._coerce_op(other, operator.add)
+    def __sub__(self, other): return self._coerce_op(other, operator.sub)
+    def __eq__(self, other): return self._coerce_cmp(other, operator.eq)
+    def __ne__(self, other): return self._coerce_cmp(other, operator.ne)
+    def __gt__(self, other): return self._coerce_cmp(other, operator.gt)
+    def __ge__(self, other): return self._coerce_cmp(other, operator.ge)
+    def __lt__(self, other): return self._coerce_cmp(other, operator.lt)
+    def __le__(self, other): return self._coerce_cmp(other, operator.le)
+    def __hash__(self):
+        return hash(self.__total_frames)
+    def __reduce__(self):
+        return (self.__class__, (self.__total_frames, self.__frame_format))
+    def __repr__(self):
+        return '{self.__class__.__name__}: {self} - {self.frame_format}'.format(self=self)
+    def __str__(self):
+        return self.get_tc_string()
+
+class TimecodeArray(object):
+    def __init__(self, **kwargs):
+        frame_format = kwargs.get('frame_format')
+        if not isinstance(frame_format, FrameFormat):
+            frame_format = FrameFormat(**frame_format)
+        self.frame_format = frame_format
+        total_frames = kwargs.get('total_frames', [])
+        self.total_frames = np.array(total_frames, dtype=np.int64, ndmin=1)
+    @classmethod
+    def from_hmsf(cls, frame_format, hours=0, minutes=0, seconds=0, frames=0):
+        if not isinstance(frame_format, FrameFormat):
+            frame_format = FrameFormat(**frame_format)
+        args = [np.asarray(v, dtype=np.int64) for v in [hours, minutes, seconds, frames]]
+        total_frames = frame_format.calc_total_frames(*args)
+        return cls(frame_format=frame_format, total_frames=total_frames)
+    @classmethod
+    def from_frames(cls, frames, frame_format=None):
+        frames = list(frames)
+        if frame_format is None:
+            frame_format = frames[0].frame_format
+        for frame in frames:
+            if frame.frame_format != frame_format:
+                raise ValueError('FrameFormat mismatch: {!r}'.format(frame))
+        total_frames = [frame.total_frames for frame in frames]
+        return cls(frame_format=frame_format, total_frames=total_frames)
+    @property
+    def hours(self):
+        return self.get_hmsf_values()[:, 0]
+    @property
+    def minutes(self):
+        return self.get_hmsf_values()[:, 1]
+    @property
+    def seconds(self):
+        return self.get_hmsf_values()[:, 2]
+    @property
+    def frames(self):
+        return self.get_hmsf_values()[:, 3]
+    def get_hmsf_values(self):
+        return np.column_stack(self.frame_format.total_frames_to_hmsf(self.total_frames))
+    def get_tc_strings(self):
+        fmt = self.frame_format
+        return [fmt.format_tc_string(hmsf) for hmsf in self.get_hmsf_values().tolist()]
+    def copy(self):
+        return self.__class__(frame_format=self.frame_format, total_frames=self.total_frames)
+    def argsort(self, kind='stable'):
+        return np.argsort(self.total_frames, kind=kind)
+    def sort(self):
+        self.total_frames.sort(kind='stable')
+    def sorted(self):
+        obj = self.copy()
+        obj.sort()
+        return obj
+    def searchsorted(self, value, side='left'):
+        value = self._coerce_value(value)
+        if value is NotImplemented:
+            raise TypeError('Cannot search for {!r}'.format(value))
+        return np.searchsorted(self.total_frames, value, side=side)
+    def _coerce_value(self, other):
+        if isinstance(other, (Timecode, Frame, TimecodeArray)):
+            if self.frame_format != other.frame_format:
+                return NotImplemented
+            return other.total_frames
+        if isinstance(other, (numbers.Number, list, tuple)):
+            return other
+        if hasattr(other, '__array__'):
+            return other
+        return NotImplemented
+    def _coerce_op(self, other, op):
+        other = self._coerce_value(other)
+        if other is NotImplemented:
+            return NotImplemented
+        tf = op(self.total_frames, other)
+        return self.__class__(frame_format=self.frame_format, total_frames=tf)
+    def _coerce_cmp(self, other, op):
+        other = self._coerce_value(other)
+        if other is NotImplemented:
+            return NotImplemented
+        return op(self.total_frames, other)
+    def __len__(self):
+        return self.total_frames.size
+    def __getitem__(self, key):
+        tf = self.total_frames[key]
+        if getattr(tf, 'ndim', 0):
+            return self.__class__(frame_format=self.frame_format, total_frames=tf)
+        return Timecode(tf, self.frame_format)
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+    def __add__(self, other): return self._coerce_op(other, operator.add)
+    def __radd__(self, other): return self._coerce_op(other, operator.add)
+    def __sub__(self, other): return self._coerce_op(other, operator.sub)
+    def __eq__(self, other): return self._coerce_cmp(other, operator.eq)
+    def __ne__(self, other): return self._coerce_cmp(other, operator.ne)
+    def __gt__(self, other): return self._coerce_cmp(other, operator.gt)
+    def __ge__(self, other): return self._coerce_cmp(other, operator.ge)
+    def __lt__(self, other): return self._coerce_cmp(other, operator.lt)
+    def __le__(self, other): return self._coerce_cmp(other, operator.le)
+    __hash__ = None
+    def __repr__(self):
+        return '{self.__class__.__name__}: {n} - {self.frame_format}'.format(self=self, n=len(self))
+
 class Counter(object):
+    hmsf_index = None
     def __init__(self, **kwargs):
         self.frame = kwargs.get('frame')
-        self._value = 0
     @property
     def value(self):
-        v = getattr(self, '_value', None)
-        if v is None:
-            v = self._value = 0
-        return v
+        return self.get_value()
     @value.setter
     def value(self, value):
         self.set_value(int(value))
+    @property
+    def _value(self):
+        return self.get_value()
+    def get_value(self):
+        return self.frame.timecode.get_hmsf_values()[self.hmsf_index]
     def set_value(self, value):
-        self._value = value
+        hmsf = self.frame.get_hmsf_values()
+        hmsf[self.hmsf_index] = value
+        self.frame.set_hmsf_values(hmsf)
+    def add(self, i):
+        hmsf = self.frame.get_hmsf_values()
+        hmsf[self.hmsf_index] += i
+        self.frame.set_hmsf_values(hmsf)
+    def incr(self):
+        self.add(1)
+    def decr(self):
+        self.add(-1)
     def __iadd__(self, i):
-        while i > 0:
-            self.incr()
-            i -= 1
+        self.add(i)
         return self
     def __isub__(self, i):
-        while i > 0:
-            self.decr()
-            i -= 1
+        self.add(-i)
         return self
     def __repr__(self):
         return '{self.__class__.__name__}: {self}'.format(self=self)
     def __str__(self):
         return '%02d' % (self.value)
 
+class Second(Counter):
+    hmsf_index = 2
+
+class Minute(Counter):
+    hmsf_index = 1
+
+class Hour(Counter):
+    hmsf_index = 0
+
+class CounterAttribute(object):
+    def __init__(self, counter_cls):
+        self.counter_cls = counter_cls
+        self.attr = '_{}'.format(counter_cls.__name__.lower())
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        counter = obj.__dict__.get(self.attr)
+        if counter is None:
+            counter = obj.__dict__[self.attr] = self.counter_cls(frame=obj)
+        return counter
+    def __set__(self, obj, value):
+        if isinstance(value, Counter):
+            obj.__dict__[self.attr] = value
+        else:
+            self.__get__(obj).value = value
+
+def whole_frames(value):
+    if not isinstance(value, numbers.Integral):
+        if not isinstance(value, numbers.Real) or value % 1 != 0:
+            raise TypeError('Frame counts must be whole numbers, not {!r}'.format(value))
+    return int(value)
+
 class Frame(Counter):
+    hmsf_index = 3
+    second = CounterAttribute(Second)
+    minute = CounterAttribute(Minute)
+    hour = CounterAttribute(Hour)
     def __init__(self, **kwargs):
         self.frame_format = kwargs.get('frame_format')
-        self._value = 0
-        self.second = Second(frame=self)
-        self.minute = Minute(frame=self)
-        self.hour = Hour(frame=self)
-        self.drop_enabled = False
-        if self.frame_format.rate.rounded == 30:
-            self.df_frame_numbers = (0, 1)
-        elif self.frame_format.rate.rounded == 60:
-            self.df_frame_numbers = (0, 1, 2, 3)
-        else:
-            self.df_frame_numbers = kwargs.get('df_frame_numbers', [])
+        self.frame = self
+        timecode = kwargs.get('timecode')
         total_frames = kwargs.get('total_frames')
-        if total_frames is not None:
+        if timecode is not None:
+            if timecode.frame_format != self.frame_format:
+                raise ValueError('FrameFormat mismatch: {!r}'.format(timecode))
+            self.timecode = timecode
+        elif total_frames is not None:
             self.set_total_frames(total_frames)
         else:
+            self.timecode = Timecode(0, self.frame_format)
             keys = ['hours', 'minutes', 'seconds', 'frames']
             hmsf = {k:kwargs.get(k) for k in keys if k in kwargs}
             if len(hmsf):
                 self.set(**hmsf)
-        if not hasattr(self, 'total_frames'):
-            self.total_frames = self.calc_total_frames()
-        fr = self.frame_format.rate.float_value
-        self.frame_times = [i / fr for i in range(int(round(fr)))]
+    @property
+    def df_frame_numbers(self):
+        return self.frame_format.df_frame_numbers
+    @property
+    def frame_times(self):
+        return self.frame_format.frame_times
+    @property
+    def total_frames(self):
+        return self.timecode.total_frames
+    @total_frames.setter
+    def total_frames(self, value):
+        self.timecode = Timecode(whole_frames(value), self.frame_format)
+    @property
+    def drop_enabled(self):
+        if not self.frame_format.drop_frame:
+            return False
+        h, m, s, f = self.timecode.get_hmsf_values()
+        return s == 0 and m % 10 != 0
+    def get_value(self):
+        return self.timecode.frames
     def incr(self):
-        self.total_frames += 1
-        value = self.value + 1
-        if value >= self.frame_format.rate.rounded:
-            value = 0
-            self.second += 1
-        self.value = value
+        self.timecode = self.timecode + 1
     def decr(self):
-        self.total_frames -= 1
-        value = self.value - 1
-        decr_second = False
-        if value < 0:
-            decr_second = True
-        elif self.frame_format.drop_frame and value in self.df_frame_numbers:
-            if self.second.value == 0 and self.minute.value % 10 != 0:
-                decr_second = True
-        if decr_second:
-            value = int(self.frame_format.rate.rounded - 1)
-            self.second -= 1
-        self.value = value
-    def set_value(self, value):
-        if self.drop_enabled and value in self.df_frame_numbers:
-            value = self.df_frame_numbers[-1] + 1
-        self._value = value
+        self.timecode = self.timecode - 1
+    def set_hmsf_values(self, hmsf):
+        h, m, s, f = hmsf
+        carry, s = divmod(s, 60)
+        m += carry
+        carry, m = divmod(m, 60)
+        h += carry
+        if self.frame_format.drop_frame and s == 0 and m % 10 != 0:
+            if f in self.df_frame_numbers:
+                f = self.df_frame_numbers[-1] + 1
+        self.timecode = Timecode.from_hmsf(self.frame_format, h, m, s, f)
     def set(self, **kwargs):
-        keys = ['hours', 'minutes', 'seconds']
-        hmsf = {k:kwargs.get(k) for k in keys if k in kwargs}
-        for key in keys:
-            if key not in kwargs:
-                continue
-            if key == 'frames':
-                obj = self
-            else:
-                attr = key.rstrip('s')
-                obj = getattr(self, attr)
-            obj.value = kwargs[key]
-        self.check_drop()
-        self.value = kwargs.get('frames', self.value)
-        self.total_frames = self.calc_total_frames()
+        hmsf = self.get_hmsf_values()
+        for i, key in enumerate(['hours', 'minutes', 'seconds', 'frames']):
+            if key in kwargs:
+                hmsf[i] = int(kwargs[key])
+        self.set_hmsf_values(hmsf)
     def from_dt(self, dt):
-        keys = ['hour', 'minute', 'second']
-        for key in keys:
-            val = getattr(dt, key)
-            obj = getattr(self, key)
-            obj.value = val
-        self.check_drop()
-        self.value = self.microseconds_to_frame(dt.microsecond)
-        self.total_frames = self.calc_total_frames()
+        self.set_hmsf_values([
+            dt.hour, dt.minute, dt.second,
+            self.microseconds_to_frame(dt.microsecond),
+        ])
     def microseconds_to_frame(self, microseconds):
-        fr = self.frame_format.rate.float_value
-        s = microseconds / 1e6
-        l = self.frame_times
-        if s in l:
-            return l.index(s)
-        closest = None
-        closest_diff = None
-        for i, f in enumerate(l):
-            if s > f:
-                diff = s - f
-            else:
-                diff = f - s
-            if closest is None:
-                closest = i
-                closest_diff = diff
-            else:
-                if diff < closest_diff:
-                    closest = i
-                    closest_diff = diff
-        return closest
+        return self.frame_format.microseconds_to_frame(microseconds)
     def set_total_frames(self, total_frames):
         self.total_frames = total_frames
-        fr = self.frame_format.rate
-        if self.frame_format.drop_frame:
-            Doffset = int(fr * 60 * 10)
-            Moffset = int(fr * 60)
-            drops_per_ten_minutes = int(fr.rounded * 60 * 10) - Doffset
-            drop_num = len(self.df_frame_numbers)
-            D = total_frames // Doffset
-            M = total_frames % Doffset
-            if M in self.df_frame_numbers:
-                add_frames = drops_per_ten_minutes * D
-            else:
-                add_frames = drops_per_ten_minutes * D + drop_num * ((M - drop_num) // Moffset)
-            if add_frames > 0:
-                total_frames += add_frames
-
-        self.hour.value = (((total_frames // fr.rounded) // 60) // 60) % 24
-        self.minute.value = ((total_frames // fr.rounded) // 60) % 60
-        self.second.value = (total_frames // fr.rounded) % 60
-        self.value = total_frames % fr.rounded
-        self.check_drop()
     def calc_total_frames(self):
-        seconds = self.second.value
-        seconds += self.minute.value * 60
-        seconds += self.hour.value * 3600
-        fr = self.frame_format.rate.rounded
-        frames = seconds * fr
-        frames += self.value
-
-        if self.frame_format.drop_frame:
-            total_minutes = 60 * self.hour.value + self.minute.value
-            drop_num = len(self.df_frame_numbers)
-            total_dropped = drop_num * (total_minutes - total_minutes // 10)
-            frames -= total_dropped
-        return frames
+        return self.frame_format.calc_total_frames(*self.get_hmsf_values())
     def check_drop(self):
-        if not self.frame_format.drop_frame:
-            return
-        drop = self.second.value == 0 and self.minute.value % 10 != 0
-        self.drop_enabled = drop
+        return self.drop_enabled
     def get_hmsf(self):
         l = []
         for attr in ['hour', 'minute', 'second']:
@@ -294,16 +628,16 @@ class Frame(Counter):
         l.append(self)
         return l
     def get_hmsf_values(self):
-        return [obj.value for obj in self.get_hmsf()]
+        return list(self.timecode.get_hmsf_values())
     def get_tc_string(self):
-        return self.frame_format.format_tc_string(self.get_hmsf_values())
+        return self.timecode.get_tc_string()
     def copy(self):
         return self.__class__(
             frame_format=self.frame_format,
-            total_frames=self.total_frames,
+            timecode=self.timecode,
         )
     def _coerce_value(self, other):
-        if isinstance(other, Frame):
+        if isinstance(other, (Frame, Timecode)):
             if self.frame_format != other.frame_format:
                 return NotImplemented
             other = other.total_frames
@@ -314,7 +648,7 @@ class Frame(Counter):
         other = self._coerce_value(other)
         if other is NotImplemented:
             return NotImplemented
-        tf = op(self.total_frames, other)
+        tf = op(self.total_frames, whole_frames(other))
         return self.__class__(frame_format=self.frame_format, total_frames=tf)
     def _coerce_cmp(self, other, op):
         other = self._coerce_value(other)
@@ -325,19 +659,13 @@ class Frame(Counter):
         other = self._coerce_value(other)
         if other is NotImplemented:
             return NotImplemented
-        if other == 1:
-            self.incr()
-        else:
-            self.set_total_frames(self.total_frames + other)
+        self.timecode = self.timecode + whole_frames(other)
         return self
     def __isub__(self, other):
         other = self._coerce_value(other)
         if other is NotImplemented:
             return NotImplemented
-        if other == 1:
-            self.decr()
-        else:
-            self.set_total_frames(self.total_frames - other)
+        self.timecode = self.timecode - whole_frames(other)
         return self
     def __add__(self, other): return self._coerce_op(other, operator.add)
     def __sub__(self, other): return self._coerce_op(other, operator.sub)
@@ -352,41 +680,3 @@ class Frame(Counter):
     def __str__(self):
         return self.get_tc_string()
 
-
-class Second(Counter):
-    def incr(self):
-        value = self.value + 1
-        if value > 59:
-            value = 0
-            self.frame.minute += 1
-        self.value = value
-    def decr(self):
-        value = self.value - 1
-        if value < 0:
-            value = 59
-            self.frame.minute -= 1
-        self.value = value
-    def set_value(self, value):
-        self._value = value
-        self.frame.check_drop()
-
-class Minute(Counter):
-    def incr(self):
-        value = self.value + 1
-        if value > 59:
-            self.frame.hour += 1
-            value = 0
-        self.value = value
-        self.frame.check_drop()
-    def decr(self):
-        value = self.value - 1
-        if value < 0:
-            value = 59
-            self.frame.hour -= 1
-        self.value = value
-
-class Hour(Counter):
-    def incr(self):
-        self.value += 1
-    def decr(self):
-        self.value -= 1
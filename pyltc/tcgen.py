@@ -1,38 +1,114 @@
+import numbers
 import time
 import threading
-import datetime
-from fractions import Fraction
+import itertools
+try:
+    import queue
+except ImportError: # pragma: no cover
+    import Queue as queue
 
 import numpy as np
 
 from pyltc import fields
-from pyltc.frames import Frame, FrameFormat
-from pyltc.audioutils import FrameResampler
+from pyltc.frames import Frame, FrameFormat, WallClock, monotonic_ns
+from pyltc.audioutils import FrameResampler, FrameRenderer, SampleClock
 
 
+class UserBitsStream(object):
+    def __init__(self, source):
+        if isinstance(source, (np.ndarray, list, tuple)):
+            self.data = np.asarray(source, dtype=np.uint32).ravel()
+            self.iterator = None
+        else:
+            self.data = None
+            self.iterator = iter(source)
+        self.position = 0
+    def read(self, num_frames):
+        if self.data is not None:
+            result = self.data[self.position:self.position+num_frames]
+        else:
+            result = np.fromiter(
+                itertools.islice(self.iterator, num_frames), dtype=np.uint32,
+            )
+        self.position += result.size
+        return result
+
+def get_frame_format(frame_format):
+    if not isinstance(frame_format, FrameFormat):
+        frame_format = FrameFormat(**frame_format)
+    return frame_format
+
 class Generator(object):
     def __init__(self, **kwargs):
-        frame_format = kwargs.get('frame_format')
-        if not isinstance(frame_format, FrameFormat):
-            frame_format = FrameFormat(**frame_format)
+        frame_format = get_frame_format(kwargs.get('frame_format'))
         self.frame_format = frame_format
         fkwargs = kwargs.get('frame', {})
         fkwargs['frame_format'] = frame_format
         self.frame = Frame(**fkwargs)
+        self.wall_clock = None
         self.data_block = fields.LTCDataBlock(generator=self)
+        self.user_bits_stream = None
+        user_bits = kwargs.get('user_bits')
+        if user_bits is not None:
+            self.set_user_bits(user_bits)
     def set_hmsf(self, **kwargs):
         self.frame.set(**kwargs)
     def incr_frame(self, value=1):
         self.frame += value
+    def get_wall_clock(self):
+        if self.wall_clock is None:
+            self.wall_clock = WallClock(
+                frame_format=self.frame_format,
+                use_utc=self.use_utc,
+            )
+        return self.wall_clock
     def set_frame_from_dt(self, dt=None, ts=None):
-        if dt is None:
-            if ts is None:
-                ts = time.time()
-            if self.use_utc:
-                dt = datetime.datetime.utcfromtimestamp(ts)
+        if dt is not None:
+            self.frame.from_dt(dt)
+            return
+        wall_clock = self.get_wall_clock()
+        if ts is None:
+            total_frames = wall_clock.get_total_frames()
+        else:
+            total_frames = wall_clock.timestamp_to_total_frames(ts)
+        self.frame.set_total_frames(total_frames)
+    def set_frame_from_monotonic(self, mono_ns):
+        total_frames = self.get_wall_clock().monotonic_to_total_frames(mono_ns)
+        self.frame.set_total_frames(total_frames)
+    @property
+    def user_bits(self):
+        return self.data_block.user_bits
+    @user_bits.setter
+    def user_bits(self, value):
+        self.set_user_bits(value)
+    def set_user_bits(self, value):
+        if isinstance(value, numbers.Integral):
+            self.user_bits_stream = None
+            self.data_block.set_user_bits(value)
+        elif value is None:
+            self.user_bits_stream = None
+        else:
+            self.user_bits_stream = UserBitsStream(value)
+    def read_user_bits(self, num_frames):
+        stream = self.user_bits_stream
+        if stream is None:
+            return None
+        payloads = stream.read(num_frames)
+        if payloads.size < num_frames:
+            self.user_bits_stream = None
+            if payloads.size:
+                fill = payloads[-1]
             else:
-                dt = datetime.datetime.fromtimestamp(ts)
-        self.frame.from_dt(dt)
+                fill = self.data_block.user_bits
+            payloads = np.concatenate([
+                payloads, np.full(num_frames - payloads.size, fill, dtype=np.uint32),
+            ])
+        if num_frames:
+            self.data_block.set_user_bits(payloads[-1])
+        return payloads
+    def next_user_bits(self):
+        if self.user_bits_stream is not None:
+            self.read_user_bits(1)
     def get_data_block_value(self):
         return self.data_block.get_value()
     def get_data_block_string(self):
@@ -46,10 +122,18 @@ class FreeRunGenerator(Generator):
         self.use_current_time = kwargs.get('use_current_time', True)
         self.use_utc = kwargs.get('use_utc', False)
         self.frame_callback = kwargs.get('frame_callback')
+        self.overrun_policy = kwargs.get('overrun_policy', 'skip')
+        if self.overrun_policy not in ['skip', 'catch_up']:
+            raise ValueError('Invalid overrun_policy: {!r}'.format(self.overrun_policy))
+        self.tick_stats = TickStats(kwargs.get('tick_stats_size'))
         self.running = threading.Event()
         self.stopped = threading.Event()
         self.frame_event = threading.Event()
         self.run_thread = None
+        self.async_source = None
+        self.subscribers = []
+        self.subscriber_lock = threading.Lock()
+        self.last_snapshot = None
     def start(self, loop=True):
         if self.running.is_set():
             return
@@ -68,104 +152,487 @@ class FreeRunGenerator(Generator):
     def stop(self):
         if not self.running.is_set():
             return
+        for sub in self.subscribers[:]:
+            self.unsubscribe(sub)
+        if self.async_source is not None:
+            self.async_source.stop()
+            self.async_source = None
+            return
         self.run_thread.stop()
         self.stopped.wait()
         self.run_thread = None
     def wait_for_frame(self, timeout=None):
-        self.frame_event.wait(timeout)
-        if not self.running.is_set:
+        if not self.frame_event.wait(timeout):
+            return None
+        self.frame_event.clear()
+        if not self.running.is_set():
             return False
-        return self.get_data_block_string()
+        snapshot = self.last_snapshot
+        if snapshot is None:
+            return self.get_data_block_string()
+        return snapshot.get_string()
+    def subscribe(self, maxsize=8, policy='drop_oldest', block_timeout=None):
+        if policy == 'block' and self.async_source is not None:
+            raise ValueError("The 'block' policy would stall the event loop")
+        sub = FrameSubscriber(maxsize=maxsize, policy=policy, block_timeout=block_timeout)
+        with self.subscriber_lock:
+            self.subscribers = self.subscribers + [sub]
+        return sub
+    def unsubscribe(self, sub):
+        with self.subscriber_lock:
+            self.subscribers = [s for s in self.subscribers if s is not sub]
+        sub.close()
+    def publish_frame(self, tick, timestamp_ns):
+        snapshot = FrameSnapshot(
+            self.frame.timecode, self.get_data_block_value(), tick, timestamp_ns,
+        )
+        self.last_snapshot = snapshot
+        for sub in self.subscribers:
+            sub.put(snapshot)
+        return snapshot
+    def get_async_source(self, loop=None):
+        if self.async_source is None:
+            if any(sub.policy == 'block' for sub in self.subscribers):
+                raise ValueError("Subscribers using the 'block' policy would stall the event loop")
+            from pyltc.aio import AsyncFrameSource
+            self.async_source = AsyncFrameSource(self, loop)
+            self.async_source.start()
+        return self.async_source
+    def frames(self, queue_size=None):
+        return self.get_async_source().frames(queue_size)
+    def next_frame(self):
+        return self.get_async_source().next_frame()
 
     def _frame_callback(self, s):
         pass
 
-class AudioGenerator(Generator):
-    def __init__(self, **kwargs):
-        super(AudioGenerator, self).__init__(**kwargs)
-        self.use_current_time = kwargs.get('use_current_time', True)
-        self.use_utc = kwargs.get('use_utc', False)
-        if self.use_current_time:
-            self.set_frame_from_dt()
+class AudioFormat(object):
+    def setup_audio(self, **kwargs):
         rs = self.sample_rate = kwargs.get('sample_rate', 48000)
-        fr = self.frame_format.rate
-        self.samples_per_frame = rs / fr
-        if int(self.samples_per_frame) == float(self.samples_per_frame):
-            self.even_samples = True
-        else:
-            self.even_samples = False
-            self.num_samples = 0
-            self.frame_count = 0
+        self.sample_clock = SampleClock(
+            sample_rate=rs,
+            frame_rate=self.frame_format.rate,
+        )
+        self.samples_per_frame = self.sample_clock.samples_per_frame
+        self.even_samples = self.sample_clock.even_samples
+        self.frame_count = 0
+        self.frame_sample_offset = 0
         self.use_float_samples = kwargs.get('use_float_samples', False)
         self.bit_depth = kwargs.get('bit_depth', 8)
-        self.dtype = kwargs.get('dtype')
         self.sampler = FrameResampler(
             out_sample_rate=self.sample_rate,
             use_float_samples=self.use_float_samples,
             bit_depth=self.bit_depth,
-            dtype=self.dtype,
+            dtype=kwargs.get('dtype'),
             frame_rate=self.frame_format.rate,
         )
-    def calc_offset(self, samples):
-        self.num_samples += samples.size
+        self.dtype = self.sampler.dtype
+        self.template = self.sampler.template
+    @property
+    def sample_position(self):
+        offset = self.sample_clock.sample_offset(self.frame_count)
+        return offset + self.frame_sample_offset
+    def samples_for_frame(self, total_frames):
+        return self.sample_clock.samples_for_frame(total_frames)
+
+class AudioGenerator(AudioFormat, Generator):
+    def __init__(self, **kwargs):
+        super(AudioGenerator, self).__init__(**kwargs)
+        self.use_current_time = kwargs.get('use_current_time', True)
+        self.use_utc = kwargs.get('use_utc', False)
+        if self.use_current_time:
+            self.set_frame_from_dt()
+        self.setup_audio(**kwargs)
+        self.renderer = FrameRenderer(self.template)
+        self.rendered_value = None
+    def next_frame_length(self):
+        num_samples, offset = self.samples_for_frame(self.frame_count)
         self.frame_count += 1
-        num_samples = self.samples_per_frame * self.frame_count
-        if float(num_samples) == int(num_samples):
-            offset = int(num_samples - self.num_samples)
-            self.num_samples += offset
-        else:
-            offset = 0
-        return offset
+        self.frame_sample_offset = 0
+        return num_samples
+    def seek_sample(self, sample_index):
+        frame_index = self.sample_clock.frame_for_sample(sample_index)
+        if frame_index != self.frame_count:
+            self.incr_frame(frame_index - self.frame_count)
+            self.frame_count = frame_index
+        self.frame_sample_offset = sample_index - self.sample_clock.sample_offset(frame_index)
+    def set_sample_from_ns(self, ts_ns):
+        wall_clock = self.get_wall_clock()
+        total_frames = wall_clock.ns_to_total_frames(ts_ns)
+        start_ns = wall_clock.total_frames_to_ns(total_frames)
+        while start_ns > ts_ns:
+            total_frames -= 1
+            start_ns = wall_clock.total_frames_to_ns(total_frames)
+        offset = (ts_ns - start_ns) * self.sample_rate // 1000000000
+        self.frame.set_total_frames(total_frames % self.frame_format.frames_per_day)
+        self.frame_count = 0
+        self.frame_sample_offset = 0
+        self.seek_sample(offset)
+    def set_sample_from_monotonic(self, mono_ns):
+        wall_clock = self.get_wall_clock()
+        self.set_sample_from_ns(mono_ns + wall_clock.monotonic_offset_ns)
     def generate_frame(self, only_zero=False):
         if only_zero:
             a = np.zeros(80, dtype=bool)
         else:
+            self.next_user_bits()
             a = self.get_data_block_array()
-        samples = self.sampler.generate_samples(a)
-        if not self.even_samples:
-            offset = self.calc_offset(samples)
-            if offset > 0:
-                offset_samples = np.array([samples[-1]] * offset)
-                samples = np.concatenate((samples, offset_samples))
-            elif offset < 0:
-                i = int(self.current_offset)
-                samples = samples[:-offset]
-        return samples
+        return self.sampler.generate_samples(a, self.next_frame_length())
     def generate_frames(self, num_frames, only_zero=False):
-        spf = int(self.samples_per_frame)
-        a = np.full((num_frames, spf+2), np.inf, dtype=self.dtype)
-        for i in range(num_frames):
-            _a = self.generate_frame(only_zero)
-            if _a.size > a.shape[1]:
-                infarr = np.full((num_frames, _a.size-a.shape[1]), np.inf, dtype=self.dtype)
-                a = np.append(a, infarr, axis=1)
-            a[i][:_a.size] = _a
-            if only_zero is False:
+        if only_zero:
+            data = np.zeros((num_frames, 80), dtype=bool)
+        else:
+            total_frames = self.frame.total_frames + np.arange(num_frames)
+            user_bits = self.read_user_bits(num_frames)
+            data = self.data_block.get_arrays(total_frames, user_bits)
+            self.incr_frame(num_frames)
+        lengths, offsets = self.sample_clock.frame_lengths(self.frame_count, num_frames)
+        self.frame_count += num_frames
+        self.frame_sample_offset = 0
+        return self.sampler.template.render_frames(data, lengths)
+    def generate_into(self, out, start_sample=None):
+        if not isinstance(out, np.ndarray):
+            out = np.frombuffer(out, dtype=self.sampler.dtype)
+        elif out.dtype != self.sampler.dtype:
+            raise ValueError('Output dtype must be {}'.format(self.sampler.dtype))
+        if start_sample is not None:
+            self.seek_sample(start_sample)
+        renderer = self.renderer
+        data_block = self.data_block
+        size = out.size
+        i = 0
+        while i < size:
+            num_samples, offset = self.samples_for_frame(self.frame_count)
+            start = self.frame_sample_offset
+            n = min(num_samples - start, size - i)
+            if start == 0 or i == 0:
+                if start == 0:
+                    self.next_user_bits()
+                value = data_block.get_value()
+                if value != self.rendered_value:
+                    renderer.set_data(data_block.get_array(copy=False))
+                    self.rendered_value = value
+            renderer.render(out[i:i+n], num_samples, start)
+            i += n
+            start += n
+            if start == num_samples:
+                self.frame_count += 1
+                self.frame_sample_offset = 0
                 self.incr_frame()
-        a = a.flatten()
-        not_nan_ix = np.nonzero(np.logical_not(np.isinf(a)))
-        return a[not_nan_ix]
+            else:
+                self.frame_sample_offset = start
+        return out
+    def iter_blocks(self, block_size, num_blocks=None):
+        i = 0
+        while num_blocks is None or i < num_blocks:
+            out = np.empty(block_size, dtype=self.sampler.dtype)
+            yield self.generate_into(out)
+            i += 1
+
+class MultiChannelGenerator(AudioFormat):
+    layouts = ('channel_major', 'interleaved')
+    def __init__(self, **kwargs):
+        frame_format = get_frame_format(kwargs.get('frame_format'))
+        self.frame_format = frame_format
+        self.layout = kwargs.get('layout', 'channel_major')
+        if self.layout not in self.layouts:
+            raise ValueError('Unknown layout: {!r}'.format(self.layout))
+        frames = kwargs.get('frames')
+        offsets = kwargs.get('offsets')
+        if frames is None:
+            fkwargs = dict(kwargs.get('frame', {}))
+            fkwargs['frame_format'] = frame_format
+            total_frames = np.array([Frame(**fkwargs).total_frames], dtype=np.int64)
+            if offsets is None:
+                total_frames = np.repeat(total_frames, kwargs.get('num_channels', 1))
+        else:
+            total_frames = np.array(
+                [self.get_total_frames(f) for f in frames], dtype=np.int64,
+            )
+        if offsets is not None:
+            total_frames = total_frames + np.asarray(offsets, dtype=np.int64)
+        self.set_total_frames(total_frames)
+        self.set_user_bits(kwargs.get('user_bits'))
+        self.setup_audio(**kwargs)
+    def get_total_frames(self, value):
+        if isinstance(value, numbers.Integral):
+            return value
+        if isinstance(value, dict):
+            value = Frame(frame_format=self.frame_format, **value)
+        elif value.frame_format != self.frame_format:
+            raise ValueError('FrameFormat mismatch: {!r}'.format(value))
+        return value.total_frames
+    def set_total_frames(self, total_frames):
+        total_frames = np.asarray(total_frames, dtype=np.int64)
+        self.total_frames = total_frames % self.frame_format.frames_per_day
+        self.num_channels = self.total_frames.size
+    def get_frames(self):
+        return [
+            Frame(frame_format=self.frame_format, total_frames=int(v))
+            for v in self.total_frames
+        ]
+    def set_user_bits(self, value):
+        if value is None:
+            value = 0
+        value = np.asarray(value, dtype=np.uint32)
+        self.user_bits = np.broadcast_to(value, (self.num_channels,)).copy()
+    def get_data_blocks(self, num_frames, user_bits=None):
+        if user_bits is None:
+            user_bits = self.user_bits[:, np.newaxis]
+        total_frames = self.total_frames[:, np.newaxis] + np.arange(num_frames)
+        total_frames %= self.frame_format.frames_per_day
+        h, m, s, f = self.frame_format.total_frames_to_hmsf(total_frames)
+        return fields.pack_datablocks(
+            hours=h, minutes=m, seconds=s, frames=f,
+            drop_frame=int(self.frame_format.drop_frame),
+            user_bits=user_bits,
+        )
+    def get_sample_index(self, lengths):
+        frame_ix = np.repeat(np.arange(lengths.size), lengths)
+        starts = np.cumsum(lengths) - lengths
+        pos = np.arange(frame_ix.size) - starts[frame_ix]
+        cell_ix = (160 * (pos + 1) - 1) // lengths[frame_ix]
+        return frame_ix, cell_ix
+    def get_output(self, size, out=None):
+        if self.layout == 'interleaved':
+            shape = (size, self.num_channels)
+        else:
+            shape = (self.num_channels, size)
+        if out is None:
+            out = np.empty(shape, dtype=self.dtype)
+        elif out.shape != shape:
+            raise ValueError('Output shape must be {}'.format(shape))
+        return out
+    def render(self, out, lengths, start, size, user_bits=None):
+        if not size:
+            return out
+        t = self.template
+        data = self.get_data_blocks(lengths.size, user_bits)
+        cells = t.levels[t.encode_cells(data).view(np.uint8)]
+        frame_ix, cell_ix = self.get_sample_index(lengths)
+        frame_ix = frame_ix[start:start+size]
+        cell_ix = cell_ix[start:start+size]
+        if self.layout == 'interleaved':
+            out[...] = cells.transpose(1, 2, 0)[frame_ix, cell_ix]
+        else:
+            cells = cells.reshape(self.num_channels, -1)
+            np.take(cells, frame_ix * 160 + cell_ix, axis=1, out=out)
+        return out
+    def advance(self, num_frames):
+        self.frame_count += num_frames
+        self.total_frames = (self.total_frames + num_frames) % self.frame_format.frames_per_day
+    def generate_frames(self, num_frames, out=None, user_bits=None):
+        lengths, offsets = self.sample_clock.frame_lengths(self.frame_count, num_frames)
+        size = int(lengths.sum())
+        out = self.get_output(size, out)
+        self.render(out, lengths, 0, size, user_bits)
+        self.advance(num_frames)
+        return out
+    def generate_into(self, out):
+        if self.layout == 'interleaved':
+            size = out.shape[0]
+        else:
+            size = out.shape[-1]
+        out = self.get_output(size, out)
+        clock = self.sample_clock
+        start = self.frame_sample_offset
+        end = self.sample_position + size
+        num_frames = clock.frame_for_sample(end - 1) - self.frame_count + 1
+        if size:
+            lengths, offsets = clock.frame_lengths(self.frame_count, num_frames)
+            self.render(out, lengths, start, size)
+        frame_index = clock.frame_for_sample(end)
+        self.advance(frame_index - self.frame_count)
+        self.frame_sample_offset = end - clock.sample_offset(frame_index)
+        return out
 
 
-class TimerThread(threading.Thread):
-    def __init__(self, generator):
-        super(TimerThread, self).__init__()
+class FrameSnapshot(object):
+    __slots__ = ('__timecode', '__value', '__tick', '__timestamp_ns', '__string')
+    def __init__(self, timecode, value, tick, timestamp_ns):
+        self.__timecode = timecode
+        self.__value = value
+        self.__tick = tick
+        self.__timestamp_ns = timestamp_ns
+        self.__string = None
+    @property
+    def timecode(self):
+        return self.__timecode
+    @property
+    def value(self):
+        return self.__value
+    @property
+    def tick(self):
+        return self.__tick
+    @property
+    def timestamp_ns(self):
+        return self.__timestamp_ns
+    def get_string(self):
+        s = self.__string
+        if s is None:
+            s = self.__string = '{:080b}'.format(self.__value)
+        return s
+    def __repr__(self):
+        return '<{self.__class__.__name__}: {self.timecode} (tick {self.tick})>'.format(self=self)
+
+class FrameSubscriber(object):
+    policies = ['drop_oldest', 'block']
+    poll_interval = .05
+    def __init__(self, **kwargs):
+        self.maxsize = kwargs.get('maxsize', 8)
+        self.policy = kwargs.get('policy', 'drop_oldest')
+        self.block_timeout = kwargs.get('block_timeout')
+        if self.policy not in self.policies:
+            raise ValueError('Invalid policy: {!r}'.format(self.policy))
+        self.queue = queue.Queue(self.maxsize)
+        self.dropped = 0
+        self.closed = False
+    def put(self, snapshot):
+        if self.closed:
+            return
+        if self.policy == 'block':
+            self.put_blocking(snapshot)
+            return
+        while True:
+            try:
+                self.queue.put_nowait(snapshot)
+                return
+            except queue.Full:
+                try:
+                    self.queue.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+    def put_blocking(self, snapshot):
+        deadline = None
+        if self.block_timeout is not None:
+            deadline = monotonic_ns() + int(self.block_timeout * 1e9)
+        while not self.closed:
+            timeout = self.poll_interval
+            if deadline is not None:
+                remaining = (deadline - monotonic_ns()) / 1e9
+                if remaining <= 0:
+                    break
+                timeout = min(timeout, remaining)
+            try:
+                self.queue.put(snapshot, timeout=timeout)
+                return
+            except queue.Full:
+                pass
+        self.dropped += 1
+    def get(self, timeout=None):
+        if self.closed and self.queue.empty():
+            return None
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+    def close(self):
+        self.closed = True
+        try:
+            self.queue.put_nowait(None)
+        except queue.Full:
+            pass
+    def __iter__(self):
+        while True:
+            snapshot = self.get()
+            if snapshot is None:
+                return
+            yield snapshot
+
+class TickStats(object):
+    size = 4096
+    percentiles = (50, 90, 99)
+    def __init__(self, size=None):
+        if size is not None:
+            self.size = size
+        self.samples = np.zeros(self.size, dtype=np.int64)
+        self.reset()
+    def reset(self):
+        self.count = 0
+        self.skipped = 0
+        self.min = None
+        self.max = None
+    def add(self, lateness_ns):
+        self.samples[self.count % self.size] = lateness_ns
+        self.count += 1
+        if self.min is None or lateness_ns < self.min:
+            self.min = lateness_ns
+        if self.max is None or lateness_ns > self.max:
+            self.max = lateness_ns
+    def get_recent(self):
+        return self.samples[:min(self.count, self.size)]
+    def percentile(self, q):
+        return np.percentile(self.get_recent(), q)
+    def get_stats(self):
+        d = {
+            'count':self.count,
+            'skipped':self.skipped,
+            'min':self.min,
+            'max':self.max,
+        }
+        if self.count:
+            values = np.percentile(self.get_recent(), self.percentiles)
+            for q, v in zip(self.percentiles, values):
+                d['p{}'.format(q)] = float(v)
+        return d
+
+class FrameScheduler(object):
+    def setup_scheduler(self, generator):
         self.generator = generator
+        fr = generator.frame_format.rate
+        self.period_num = fr.denom * 1000000000
+        self.period_den = fr.numerator
+        self.reset()
+    def reset(self, start_ns=None):
+        if start_ns is None:
+            start_ns = monotonic_ns()
+        self.start_ns = start_ns
+        self.tick = 0
+    def get_deadline(self, tick):
+        return self.start_ns - (-tick * self.period_num // self.period_den)
+    def get_tick(self, now_ns):
+        return (now_ns - self.start_ns) * self.period_den // self.period_num
+    def advance(self, now_ns):
+        g = self.generator
+        self.tick += 1
+        missed = self.get_tick(now_ns) - self.tick
+        if missed > 0 and g.overrun_policy == 'skip':
+            g.tick_stats.skipped += missed
+            self.tick += missed
+        else:
+            missed = 0
+        deadline = self.get_deadline(self.tick)
+        g.tick_stats.add(now_ns - deadline)
+        num_frames = missed + 1
+        if g.use_current_time:
+            g.set_frame_from_monotonic(deadline)
+        else:
+            g.incr_frame(num_frames)
+        g.read_user_bits(num_frames)
+        g.publish_frame(self.tick, deadline)
+        return num_frames
+
+class TimerThread(FrameScheduler, threading.Thread):
+    def __init__(self, generator):
+        threading.Thread.__init__(self)
+        self.setup_scheduler(generator)
     def run(self):
         g = self.generator
-        fr = g.frame_format.rate.float_value
-        interval = 1 / fr
-        start_ts = self.start_time = time.time()
-        last_ts = start_ts
+        self.start_time = time.time()
+        self.reset()
         if g.use_current_time:
-            g.set_frame_from_dt(ts=start_ts)
+            g.set_frame_from_monotonic(self.start_ns)
         g.running.set()
         while g.running.is_set():
-            time.sleep(interval)
-            if g.use_current_time:
-                g.set_frame_from_dt()
-            else:
-                g.incr_frame()
+            deadline = self.get_deadline(self.tick + 1)
+            now = monotonic_ns()
+            if now < deadline:
+                time.sleep((deadline - now) / 1e9)
+                now = monotonic_ns()
+            if not g.running.is_set():
+                break
+            self.advance(now)
             g.frame_event.set()
         g.stopped.set()
     def stop(self):
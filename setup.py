@@ -39,7 +39,8 @@ setup(
     description = 'Tools for working with LTC (Linear Timecode)',
     packages=find_packages(exclude=['tests*']),
     include_package_data=True,
-    install_requires=['numpy', 'scipy', 'JACK-Client'],
+    install_requires=['numpy', 'JACK-Client'],
+    extras_require={'test':['scipy']},
     setup_requires=['pypandoc'],
     long_description=get_long_description(),
     classifiers = [
@@ -1,3 +1,4 @@
+import sys
 import shlex
 import subprocess
 import time
@@ -12,6 +13,10 @@ import jack
 
 import pytest
 
+collect_ignore = []
+if sys.version_info < (3, 6):
+    collect_ignore.append('test_aio.py')
+
 FRAME_FORMATS = [
     {'rate':29.97},
     {'rate':29.97, 'drop_frame':True},
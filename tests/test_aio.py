@@ -0,0 +1,133 @@
+import asyncio
+
+import pytest
+
+def run(coro):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+
+def test_next_frame(frame_format, monkeypatch):
+    import pyltc.aio
+    from pyltc.tcgen import FreeRunGenerator
+    from pyltc.frames import Timecode
+
+    # Ticks are driven by hand against a fake clock so that scheduling
+    # delays cannot skip frames
+    clock = [0]
+    monkeypatch.setattr(pyltc.aio, 'monotonic_ns', lambda: clock[0])
+
+    async def main():
+        generators = [
+            FreeRunGenerator(use_current_time=False, frame_format=frame_format)
+            for i in range(8)
+        ]
+        for i, g in enumerate(generators):
+            g.frame.set_total_frames(i * 1000)
+        results = []
+        for j in range(3):
+            waiters = [g.next_frame() for g in generators]
+            for g in generators:
+                source = g.async_source
+                clock[0] = source.get_deadline(source.tick + 1)
+                source.on_timer()
+            results.append(await asyncio.gather(*waiters))
+        for g in generators:
+            g.stop()
+            assert g.async_source is None
+            assert not g.running.is_set()
+        return results
+
+    results = run(main())
+    for j, timecodes in enumerate(results):
+        for i, tc in enumerate(timecodes):
+            assert isinstance(tc, Timecode)
+            assert tc.total_frames == i * 1000 + j + 1
+
+def test_frames_iter():
+    from pyltc.tcgen import FreeRunGenerator
+
+    async def main():
+        g = FreeRunGenerator(
+            use_current_time=False, frame_format={'rate':29.97}, overrun_policy='catch_up',
+        )
+        timecodes = []
+        async for tc in g.frames():
+            timecodes.append(tc)
+            if len(timecodes) == 10:
+                g.stop()
+        return g, timecodes
+
+    g, timecodes = run(main())
+    assert [tc.total_frames for tc in timecodes] == list(range(1, 11))
+    stats = g.tick_stats.get_stats()
+    assert stats['count'] == 10
+    assert stats['min'] >= 0
+
+def test_frames_queue_overflow(monkeypatch):
+    import pyltc.aio
+    from pyltc.tcgen import FreeRunGenerator
+
+    clock = [0]
+    monkeypatch.setattr(pyltc.aio, 'monotonic_ns', lambda: clock[0])
+
+    async def main():
+        g = FreeRunGenerator(use_current_time=False, frame_format={'rate':30})
+        it = g.frames(queue_size=2)
+        source = g.async_source
+        for i in range(5):
+            clock[0] = source.get_deadline(source.tick + 1)
+            source.on_timer()
+        g.stop()
+        return [tc async for tc in it]
+
+    timecodes = run(main())
+    assert [tc.total_frames for tc in timecodes] == [4, 5]
+
+def test_wait_for_frame():
+    import time
+    from pyltc.tcgen import FreeRunGenerator
+
+    g = FreeRunGenerator(use_current_time=False, frame_format={'rate':30})
+    g.start(loop=False)
+    try:
+        values = []
+        for i in range(5):
+            s = g.wait_for_frame(timeout=1)
+            assert s is not None
+            values.append(g.frame.total_frames)
+        assert values == sorted(set(values))
+    finally:
+        g.stop()
+
+def test_slow_subscriber():
+    from pyltc.tcgen import FreeRunGenerator
+
+    async def main():
+        g = FreeRunGenerator(
+            use_current_time=False, frame_format={'rate':30}, overrun_policy='catch_up',
+        )
+        other = FreeRunGenerator(use_current_time=False, frame_format={'rate':30})
+        other.subscribe(policy='block')
+        with pytest.raises(ValueError):
+            other.get_async_source()
+
+        it = g.frames()
+        with pytest.raises(ValueError):
+            g.subscribe(policy='block')
+        # Nothing reads from this subscriber, so its queue stays full
+        sub = g.subscribe(maxsize=1)
+        timecodes = []
+        async def consume():
+            async for tc in it:
+                timecodes.append(tc)
+                if len(timecodes) == 5:
+                    g.stop()
+        await asyncio.wait_for(consume(), 2)
+        return sub, timecodes
+
+    sub, timecodes = run(main())
+    assert [tc.total_frames for tc in timecodes] == list(range(1, 6))
+    assert sub.dropped >= 3
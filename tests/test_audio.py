@@ -87,3 +87,259 @@ def test_jackaudio(jack_listen_client, ltc_frame_format):
         print('final sample size: ', received_samples.size)
 
         assert np.array_equal(received_samples, expected_samples)
+
+def test_jack_clock():
+    import random
+    from pyltc.audio.pyjack_audio import JackClock
+
+    sample_rate = 48000
+    size = 256
+    start_frame = 0xFFFFFFFF - 100 * size
+    def frame_to_ns(frame):
+        return 10 ** 12 + (frame - start_frame) * 10 ** 9 * 1.0001 / sample_rate
+
+    clock = JackClock(sample_rate=sample_rate)
+    rand = random.Random(1)
+    frame = start_frame
+    for i in range(20000):
+        now = frame_to_ns(frame) + rand.uniform(0, 200000)
+        clock.update(frame & JackClock.frame_mask, size, int(now))
+        frame += size
+    assert clock.f0 == frame - size
+    assert clock.f1 == frame
+    for offset in [0, size, 12000]:
+        err = clock.frame_to_ns(frame + offset) - frame_to_ns(frame + offset)
+        assert 50000 < err < 150000
+
+    # A captured state keeps mapping frames after later updates
+    state = clock.state
+    assert state[0] == clock.f1
+    expected = clock.frame_to_ns(frame + 12000)
+    clock.update(frame & JackClock.frame_mask, size, int(frame_to_ns(frame)))
+    assert clock.frame_to_ns(frame + 12000, state) == expected
+    frame += size
+
+    # A skipped period restarts the filter from the new timestamp
+    frame += size * 3
+    now = int(frame_to_ns(frame))
+    clock.update(frame & JackClock.frame_mask, size, now)
+    assert clock.f0 == frame
+    assert clock.frame_to_ns(frame + size) == int(round(now + size * 1e9 / sample_rate))
+
+class FakeRingBuffer(object):
+    def __init__(self, size):
+        self.size = size
+        self.data = bytearray()
+    @property
+    def read_space(self):
+        return len(self.data)
+    @property
+    def write_space(self):
+        return self.size - len(self.data)
+    def write(self, a):
+        b = np.asarray(a).tobytes()[:self.write_space]
+        self.data.extend(b)
+        return len(b)
+    def readinto(self, out):
+        n = min(out.nbytes, len(self.data))
+        out.view(np.uint8)[:n] = np.frombuffer(bytes(self.data[:n]), dtype=np.uint8)
+        del self.data[:n]
+        return n
+    def reset(self):
+        self.data = bytearray()
+
+class FakePort(object):
+    def __init__(self, size):
+        self.array = np.empty(size, dtype=np.float32)
+    def get_array(self):
+        return self.array
+
+class FakeBackend(object):
+    queue_samples = 4800
+    low_water_samples = 2400
+
+def test_output_underrun():
+    from pyltc.tcgen import AudioGenerator
+    from pyltc.audio.pyjack_audio import LTCOutput
+
+    kwargs = dict(
+        frame_format={'rate':25},
+        bit_depth=32,
+        use_float_samples=True,
+        dtype=np.dtype(np.float32),
+        sample_rate=48000,
+        use_current_time=False,
+    )
+    size = 1024
+    output = LTCOutput(backend=FakeBackend(), generator=AudioGenerator(**kwargs))
+    output.buffer.buffer = FakeRingBuffer(FakeBackend.queue_samples * 4)
+    output.port = FakePort(size)
+    expected = AudioGenerator(**kwargs).generate_frames(25)
+
+    assert output.fill() == FakeBackend.queue_samples * 4
+    position = 0
+    for i in range(4):
+        output.process(size)
+        assert np.array_equal(output.port.array, expected[position:position+size])
+        position += size
+    output.process(size)
+    n = FakeBackend.queue_samples - position
+    assert np.array_equal(output.port.array[:n], expected[position:position+n])
+    assert not np.any(output.port.array[n:])
+    assert output.underruns == 1
+    assert output.missed_samples == size - n
+    position += size
+
+    # The generator skips the samples that were output as silence
+    output.fill()
+    output.process(size)
+    assert np.array_equal(output.port.array, expected[position:position+size])
+    assert output.skipped_samples == output.missed_samples
+
+def test_grouped_fill():
+    from pyltc.tcgen import AudioGenerator
+    from pyltc.audio.pyjack_audio import JackAudio
+
+    def build_generator(rate, hours):
+        return AudioGenerator(
+            frame_format={'rate':rate},
+            bit_depth=32,
+            use_float_samples=True,
+            dtype=np.dtype(np.float32),
+            sample_rate=48000,
+            use_current_time=False,
+            frame={'hours':hours},
+        )
+    specs = [(25, 1), (25, 2), (29.97, 3), (25, 4)]
+    aud = JackAudio(
+        outputs=[{'generator':build_generator(*spec)} for spec in specs],
+        enable_mtc=False,
+        queue_ms=100,
+    )
+    expected = [build_generator(*spec) for spec in specs]
+    for output in aud.outputs:
+        output.buffer.buffer = FakeRingBuffer(aud.queue_samples * 4)
+    aud.process_timestamp = 0
+    aud.aligned = True
+
+    def read_and_compare(size):
+        for output, g in zip(aud.outputs, expected):
+            a = np.empty(size, dtype=np.float32)
+            assert output.buffer.read_into(a) == size
+            assert np.array_equal(a, g.generate_into(np.empty(size, dtype=np.float32)))
+
+    for size in [1000, 3333, aud.queue_samples, 17]:
+        aud.fill_buffer()
+        assert len(aud.group_generators) == 1
+        read_and_compare(size)
+    read_and_compare(aud.buffer.num_samples)
+    for output, g in zip(aud.outputs, expected):
+        assert output.generator.frame == g.frame
+        assert output.generator.sample_position == g.sample_position
+
+@pytest.mark.parametrize('ppm', [-500, 500])
+def test_drift_correction(ppm):
+    from pyltc.frames import monotonic_ns
+    from pyltc.tcgen import AudioGenerator
+    from pyltc.audio.pyjack_audio import JackAudio
+
+    sample_rate = 48000
+    generator = AudioGenerator(
+        frame_format={'rate':25},
+        bit_depth=32,
+        use_float_samples=True,
+        dtype=np.dtype(np.float32),
+        sample_rate=sample_rate,
+    )
+    aud = JackAudio(generator=generator, enable_mtc=False, queue_ms=100)
+    output = aud.outputs[0]
+    output.buffer.buffer = FakeRingBuffer(aud.queue_samples * 4)
+    aud.process_timestamp = 0
+    # The sound card runs off-speed against the monotonic clock
+    frame_ns = 1e9 * (1 + ppm * 1e-6) / sample_rate
+    start_ns = monotonic_ns()
+    aud.clock.state = (0, float(start_ns), frame_ns)
+    aud.clock.initialized = True
+
+    corrections = []
+    correct_drift = output.correct_drift
+    def record_correction(a):
+        drift = output.drift_samples
+        a = correct_drift(a)
+        if not output.drift_samples:
+            corrections.append((drift, generator.frame_sample_offset))
+        return a
+    output.correct_drift = record_correction
+
+    size = 1024
+    threshold = aud.drift_threshold_samples
+    frame = 0
+    for i in range(500):
+        aud.fill_buffer()
+        a = np.empty(size, dtype=np.float32)
+        assert output.buffer.read_into(a) == size
+        frame += size
+        aud.clock.state = (frame, start_ns + frame * frame_ns, frame_ns)
+        write_ns = aud.get_write_time(output)
+        assert abs(output.get_drift(write_ns)) <= threshold + 16
+    assert output.drift_corrections == len(corrections) > 0
+    assert np.sign(output.corrected_samples) == np.sign(ppm)
+    assert abs(output.corrected_samples - frame * ppm * 1e-6) <= threshold + 16
+
+    # Samples are dropped from the start of a frame or held after its end
+    for drift, offset in corrections:
+        assert np.sign(drift) == np.sign(ppm)
+        assert offset == max(drift, 0)
+
+    # Without correction the error keeps growing
+    aud.drift_threshold_ms = 10000
+    start_drift = output.get_drift(write_ns)
+    for i in range(100):
+        aud.fill_buffer()
+        assert output.buffer.read_into(a) == size
+        frame += size
+        aud.clock.state = (frame, start_ns + frame * frame_ns, frame_ns)
+    write_ns = aud.get_write_time(output)
+    growth = output.get_drift(write_ns) - start_drift
+    assert abs(growth - 100 * size * ppm * 1e-6) <= 2
+
+class FakeClient(object):
+    last_frame_time = 4800
+    transport_frame = None
+
+def test_jack_transport_before_clock():
+    from pyltc.tcgen import AudioGenerator
+    from pyltc.audio.pyjack_audio import JackAudio
+
+    generator = AudioGenerator(
+        frame_format={'rate':25},
+        bit_depth=32,
+        use_float_samples=True,
+        dtype=np.dtype(np.float32),
+        sample_rate=48000,
+    )
+    aud = JackAudio(generator=generator, enable_mtc=False)
+    aud.client = FakeClient()
+    aud.outputs[0].port = FakePort(1024)
+    assert aud.set_jack_transport() is False
+    assert aud.client.transport_frame is None
+
+    # The clock is updated before the cycle is published
+    update = aud.clock.update
+    def check_update(*args):
+        assert aud.process_timestamp is None
+        update(*args)
+    aud.clock.update = check_update
+    aud.jack_process_callback(1024)
+    assert aud.process_timestamp == FakeClient.last_frame_time
+    assert aud.set_jack_transport() is True
+    assert aud.client.transport_frame is not None
+
+def test_output_dtype():
+    from pyltc.tcgen import AudioGenerator
+    from pyltc.audio.pyjack_audio import JackAudio
+
+    generator = AudioGenerator(frame_format={'rate':25}, sample_rate=48000)
+    assert generator.dtype != np.float32
+    with pytest.raises(ValueError):
+        JackAudio(generator=generator, enable_mtc=False)
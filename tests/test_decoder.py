@@ -45,3 +45,90 @@ def test_decode():
         assert np.array_equal(in_data, out_data)
         x += 1
         y += 1
+
+def test_decode_chunked(ltc_frame_format):
+    from pyltc.tcgen import AudioGenerator
+    from pyltc.audioutils import LTCDataBlockDecoder, DATABLOCK_DTYPE
+    num_frames = 90
+    kwargs = dict(
+        use_current_time=False,
+        bit_depth=16,
+        frame_format=ltc_frame_format,
+    )
+    g = AudioGenerator(**kwargs)
+    generated = []
+    for i in range(num_frames):
+        generated.append(g.get_data_block_array())
+        g.incr_frame()
+    g = AudioGenerator(**kwargs)
+    samples = g.generate_frames(num_frames)
+
+    for chunk_size in [samples.size, 4096, 1000, 128]:
+        decoder = LTCDataBlockDecoder()
+        blocks = []
+        for i in range(0, samples.size, chunk_size):
+            blocks.append(decoder.decode(samples[i:i+chunk_size]))
+        blocks = np.concatenate(blocks)
+        assert blocks.dtype == DATABLOCK_DTYPE
+
+        # The first block has no leading edge and the last one no trailing edge
+        assert blocks.size == num_frames - 2
+        for i, block in enumerate(blocks):
+            assert np.array_equal(block['data'], generated[i+1])
+            num_samples, offset = g.samples_for_frame(i+1)
+            assert block['start_sample'] == offset
+            assert block['end_sample'] == offset + num_samples
+
+def test_decode_varispeed():
+    from pyltc.tcgen import AudioGenerator
+    from pyltc.audioutils import LTCDataBlockDecoder
+    num_frames = 150
+    kwargs = dict(
+        use_current_time=False,
+        bit_depth=16,
+        frame_format={'rate':29.97, 'drop_frame':True},
+    )
+    g = AudioGenerator(**kwargs)
+    generated = []
+    for i in range(num_frames):
+        generated.append(g.get_data_block_array().tobytes())
+        g.incr_frame()
+    g = AudioGenerator(**kwargs)
+    samples = g.generate_frames(num_frames)
+
+    # Ramp the playback speed from 0.6x to 1.6x
+    speed = np.linspace(.6, 1.6, samples.size)
+    phase = np.cumsum(speed)
+    phase = phase[phase < samples.size - 1]
+    samples = samples[phase.astype(int)]
+
+    chunk_size = 64
+    decoder = LTCDataBlockDecoder()
+    blocks = []
+    for i in range(0, samples.size, chunk_size):
+        _blocks = decoder.decode(samples[i:i+chunk_size])
+
+        # Each block is available as soon as its final edge arrives
+        assert np.all(_blocks['end_sample'] >= i)
+        assert np.all(_blocks['end_sample'] < i + chunk_size)
+        blocks.extend(_blocks)
+    assert len(blocks) == num_frames - 2
+    for i, block in enumerate(blocks):
+        assert block['data'].tobytes() == generated[i+1]
+
+def test_decode_timecodes(ltc_frame_format):
+    from pyltc.tcgen import AudioGenerator
+    from pyltc.audioutils import LTCDataBlockDecoder
+    g = AudioGenerator(
+        use_current_time=False,
+        bit_depth=16,
+        frame_format=ltc_frame_format,
+        frame={'hours':1, 'minutes':9, 'seconds':58},
+    )
+    start_frames = g.frame.total_frames
+    samples = g.generate_frames(120)
+    decoder = LTCDataBlockDecoder(frame_format=g.frame_format)
+    blocks, timecodes = decoder.decode_timecodes(samples)
+    assert blocks.size == timecodes.size == 118
+    assert np.all(timecodes['parity_valid'])
+    assert np.array_equal(timecodes['total_frames'], np.arange(1, 119) + start_frames)
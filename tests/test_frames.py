@@ -1,4 +1,5 @@
 from fractions import Fraction
+import time
 
 import pytest
 
@@ -103,6 +104,26 @@ def test_frame_rate_ops():
             else:
                 assert flt_secs == fr_secs
 
+        assert isinstance(frame_rate.rounded, int)
+        assert frame_rate.rounded == round(frame_rate.value)
+        assert frame_rate.frames_per_minute == int(frame_rate.value * 60)
+        assert frame_rate.frames_per_ten_minutes == int(frame_rate.value * 600)
+        assert FrameRate(frame_rate.numerator * 2, frame_rate.denom * 2) is frame_rate
+        assert hash(frame_rate) == hash(frame_rate.value)
+
+        for other_args in FrameRate.defaults.values():
+            other = FrameRate(*other_args)
+            assert (frame_rate < other) == (frame_rate.value < other.value)
+            assert (frame_rate == other) == (frame_rate.value == other.value)
+        for i in range(20, 65):
+            assert (frame_rate < i) == (frame_rate.value < i)
+            assert (frame_rate >= i) == (frame_rate.value >= i)
+            assert (frame_rate == i) == (frame_rate.value == i)
+            assert frame_rate * i == frame_rate.value * i
+            assert i * frame_rate == frame_rate.value * i
+            assert frame_rate // i == frame_rate.value // i
+            assert i % frame_rate == i % frame_rate.value
+
 def test_2997_df():
     from pyltc.frames import FrameFormat, Frame
     fmt = FrameFormat(rate=29.97, drop_frame=True)
@@ -316,6 +337,33 @@ def test_copy(frame_format):
     assert frame.total_frames == frame2.total_frames
     assert str(frame) == str(frame2)
 
+def test_frame_format_tables(frame_format):
+    import pickle
+    from pyltc.frames import FrameFormat, FrameRate, Frame
+
+    fmt = FrameFormat(**frame_format)
+    fr = fmt.rate
+    assert FrameFormat(**frame_format) is fmt
+    assert FrameFormat(FrameRate(fr.numerator, fr.denom), fmt.drop_frame) is fmt
+    assert pickle.loads(pickle.dumps(fmt)) is fmt
+    assert FrameFormat(rate=frame_format['rate'], drop_frame=not fmt.drop_frame) is not fmt
+    assert len({fmt, FrameFormat(**frame_format)}) == 1
+
+    assert fmt.frame_times == tuple(i / fr.float_value for i in range(fr.rounded))
+    assert fmt.tens_units[59] == (5, 9)
+    assert fmt.frames_per_second == fr.rounded
+    if fmt.drop_frame:
+        assert fmt.frames_per_ten_minutes == fr.numerator * 600 // fr.denom
+        assert fmt.frames_per_minute == fr.numerator * 60 // fr.denom
+    else:
+        assert fmt.frames_per_ten_minutes == fr.rounded * 600
+    assert fmt.frames_per_day == fmt.calc_total_frames(24, 0, 0, 0)
+    assert fmt.total_frames_to_hmsf(fmt.frames_per_day - 1) == (23, 59, 59, fr.rounded - 1)
+
+    frame = Frame(frame_format=fmt)
+    assert frame.frame_times is fmt.frame_times
+    assert frame.df_frame_numbers is fmt.df_frame_numbers
+
 def test_decr(frame_format):
     from pyltc.frames import FrameFormat, Frame
 
@@ -347,3 +395,204 @@ def test_decr(frame_format):
                 assert frame.value >= 2
 
         frame -= 1
+
+def test_timecode_array(frame_format):
+    import numpy as np
+    from pyltc.frames import FrameFormat, Frame, TimecodeArray
+
+    fmt = FrameFormat(**frame_format)
+    num_frames = int(fmt.rate.rounded * 3600)
+    arr = TimecodeArray(frame_format=fmt, total_frames=np.arange(num_frames))
+    assert len(arr) == num_frames
+
+    hmsf = arr.get_hmsf_values()
+    assert hmsf.shape == (num_frames, 4)
+    arr2 = TimecodeArray.from_hmsf(fmt, *hmsf.T)
+    assert np.array_equal(arr2.total_frames, arr.total_frames)
+    assert np.all(arr == arr2)
+
+    strings = arr.get_tc_strings()
+    hours, minutes, seconds, frames = arr.hours, arr.minutes, arr.seconds, arr.frames
+    for total_frames in range(0, num_frames, 97):
+        frame = Frame(frame_format=fmt, total_frames=total_frames)
+        assert arr[total_frames] == frame
+        assert strings[total_frames] == str(frame)
+        assert list(hmsf[total_frames]) == frame.get_hmsf_values()
+        assert hours[total_frames] == frame.hour.value
+        assert minutes[total_frames] == frame.minute.value
+        assert seconds[total_frames] == frame.second.value
+        assert frames[total_frames] == frame.value
+
+    frames = [Frame(frame_format=fmt, total_frames=tf) for tf in [5, 2, 900]]
+    arr3 = TimecodeArray.from_frames(frames)
+    assert arr3.total_frames.tolist() == [5, 2, 900]
+
+    one_hour = Frame(frame_format=fmt, hours=1)
+    arr4 = arr + one_hour
+    assert isinstance(arr4, TimecodeArray)
+    assert np.all(arr4.hours == arr.hours + 1)
+    assert np.all(arr4.minutes == arr.minutes)
+    assert np.all((arr4 - one_hour) == arr)
+    assert np.all(arr4 > arr)
+    assert np.all(arr <= arr4)
+    assert not np.any(arr4 == arr)
+    assert np.all((arr + 10).total_frames == arr.total_frames + 10)
+
+    shuffled = arr[np.random.permutation(num_frames)]
+    assert not np.array_equal(shuffled.total_frames, arr.total_frames)
+    assert np.array_equal(shuffled[shuffled.argsort()].total_frames, arr.total_frames)
+    assert np.array_equal(shuffled.sorted().total_frames, arr.total_frames)
+    shuffled.sort()
+    assert np.array_equal(shuffled.total_frames, arr.total_frames)
+
+    assert arr.searchsorted(frames[2]) == 900
+    assert arr.searchsorted(frames[2], side='right') == 901
+    assert arr.searchsorted(arr3).tolist() == [5, 2, 900]
+
+    other_fmt = FrameFormat(rate=24 if fmt.rate != 24 else 25)
+    with pytest.raises(TypeError):
+        arr + Frame(frame_format=other_fmt)
+
+def test_timecode_value(frame_format):
+    import pickle
+    from pyltc.frames import FrameFormat, Frame, Timecode
+
+    fmt = FrameFormat(**frame_format)
+    num_frames = int(fmt.rate.rounded * 3600)
+
+    tc = Timecode(0, fmt)
+    with pytest.raises(AttributeError):
+        tc.total_frames = 1
+    with pytest.raises(AttributeError):
+        tc.foo = 1
+
+    seen = set()
+    for total_frames in range(0, num_frames, 61):
+        tc = Timecode(total_frames, fmt)
+        frame = Frame(frame_format=fmt, total_frames=total_frames)
+        assert tc == frame == total_frames
+        assert str(tc) == str(frame)
+        assert list(tc.get_hmsf_values()) == frame.get_hmsf_values()
+        assert Timecode.from_hmsf(fmt, *tc.get_hmsf_values()) == tc
+        assert frame.timecode == tc
+        assert Frame(frame_format=fmt, timecode=tc).get_hmsf_values() == frame.get_hmsf_values()
+
+        assert tc + 1 == total_frames + 1
+        assert (tc + 1) - tc == total_frames + 1 - total_frames
+        assert tc + 10000 > tc
+        assert tc < tc + 1
+        assert isinstance(tc + 1, Timecode)
+
+        assert hash(tc) == hash(Timecode(total_frames, fmt))
+        assert tc not in seen
+        seen.add(tc)
+        assert Timecode(total_frames, fmt) in seen
+
+        tc2 = pickle.loads(pickle.dumps(tc))
+        assert tc2 == tc
+        assert tc2.frame_format == fmt
+        assert str(tc2) == str(tc)
+
+    # Counter arithmetic carries in constant time
+    frame = Frame(frame_format=fmt)
+    frame.second += 3600 * 5
+    assert frame.get_hmsf_values() == [5, 0, 0, 0]
+    frame.minute -= 61
+    assert frame.get_hmsf_values()[:3] == [3, 59, 0]
+    frame.hour += 2
+    assert frame.hour.value == 5
+    assert frame.hour is frame.hour
+
+    # Counters are only built when accessed
+    frame2 = frame + 1
+    assert not any(k in frame2.__dict__ for k in ['_second', '_minute', '_hour'])
+    assert frame2.second.value == frame.second.value
+    assert frame2.second.frame is frame2
+
+    # Whole-number floats are accepted the same way everywhere
+    total_frames = frame.total_frames
+    assert (frame + 1.0).total_frames == total_frames + 1
+    assert (frame - Fraction(2)).total_frames == total_frames - 2
+    frame += 1.0
+    assert frame.total_frames == total_frames + 1
+    frame.total_frames = float(total_frames)
+    assert frame.total_frames == total_frames
+    assert isinstance(frame.total_frames, int)
+    # Anything else raises instead of truncating
+    for value in [1.5, Fraction(1, 2), float('nan'), float('inf')]:
+        with pytest.raises(TypeError):
+            frame + value
+        with pytest.raises(TypeError):
+            frame -= value
+        with pytest.raises(TypeError):
+            frame.total_frames = value
+    assert frame.total_frames == total_frames
+    assert frame < total_frames + .5
+
+def test_wall_clock(frame_format):
+    import datetime
+    from pyltc.frames import FrameFormat, Frame, WallClock, monotonic_ns
+
+    fmt = FrameFormat(**frame_format)
+    fr = fmt.rate
+    for us in range(0, 1000000, 7):
+        f = fmt.microseconds_to_frame(us)
+        assert 0 <= f < fr.rounded
+        # Nearest frame start at the exact rational rate
+        diff = abs(Fraction(us, 1000000) - Fraction(f) / fr.value)
+        if f > 0:
+            assert diff <= abs(Fraction(us, 1000000) - Fraction(f - 1) / fr.value)
+        if f < fr.rounded - 1:
+            assert diff <= abs(Fraction(us, 1000000) - Fraction(f + 1) / fr.value)
+
+    clock = WallClock(frame_format=fmt, use_utc=True)
+    today = datetime.datetime.utcfromtimestamp(clock.midnight_ns // 1000000000)
+    assert today.time() == datetime.time()
+    frame = Frame(frame_format=fmt)
+    for h, m in [(0, 0), (0, 1), (1, 9), (1, 10), (23, 59)]:
+        for s in [0, 1, 59]:
+            for us in range(3, 1000000, 16661):
+                dt = today.replace(hour=h, minute=m, second=s, microsecond=us)
+                frame.from_dt(dt)
+                ts_ns = clock.midnight_ns + ((h * 60 + m) * 60 + s) * 1000000000 + us * 1000
+                assert clock.ns_to_total_frames(ts_ns) == frame.total_frames
+
+    # Crossing midnight re-syncs the epoch offset
+    ts_ns = clock.midnight_ns + clock.day_ns + 1000000000
+    assert clock.ns_to_total_frames(ts_ns) == fr.rounded
+    assert clock.midnight_ns == ts_ns - 1000000000
+
+    now = monotonic_ns()
+    clock.sync()
+    assert clock.monotonic_to_total_frames(now) <= clock.get_total_frames()
+
+@pytest.mark.skipif(not hasattr(time, 'tzset'), reason='requires time.tzset')
+def test_wall_clock_dst(monkeypatch):
+    import calendar
+    from pyltc.frames import FrameFormat, WallClock
+
+    fmt = FrameFormat(rate=25)
+    monkeypatch.setenv('TZ', 'EST5EDT,M3.2.0,M11.1.0')
+    time.tzset()
+    try:
+        clock = WallClock(frame_format=fmt)
+        def utc_ns(*args):
+            return calendar.timegm(args + (0,)) * 1000000000
+        def hmsf(ts_ns):
+            return fmt.total_frames_to_hmsf(clock.ns_to_total_frames(ts_ns))
+
+        # Spring forward: 02:00 EST -> 03:00 EDT on 2026-03-08
+        assert hmsf(utc_ns(2026, 3, 8, 6, 30, 0)) == (1, 30, 0, 0)
+        assert hmsf(utc_ns(2026, 3, 8, 6, 59, 59)) == (1, 59, 59, 0)
+        assert hmsf(utc_ns(2026, 3, 8, 7, 0, 0)) == (3, 0, 0, 0)
+        assert hmsf(utc_ns(2026, 3, 8, 7, 30, 0)) == (3, 30, 0, 0)
+        assert hmsf(utc_ns(2026, 3, 8, 10, 30, 0)) == (6, 30, 0, 0)
+
+        # Fall back: 02:00 EDT -> 01:00 EST on 2026-11-01
+        assert hmsf(utc_ns(2026, 11, 1, 5, 30, 0)) == (1, 30, 0, 0)
+        assert hmsf(utc_ns(2026, 11, 1, 6, 0, 0)) == (1, 0, 0, 0)
+        assert hmsf(utc_ns(2026, 11, 1, 6, 30, 0)) == (1, 30, 0, 0)
+        assert hmsf(utc_ns(2026, 11, 1, 12, 0, 0)) == (7, 0, 0, 0)
+    finally:
+        monkeypatch.undo()
+        time.tzset()
@@ -1,7 +1,11 @@
 import os
 
 import numpy as np
-import scipy.io.wavfile as wavfile
+import pytest
+try:
+    import scipy.io.wavfile as wavfile
+except ImportError:
+    wavfile = None
 
 def bools_to_int(b):
     n = 0
@@ -60,8 +64,47 @@ def test_datablock(ltc_frame_format):
 
         g.incr_frame()
 
+def test_datablock_incremental(ltc_frame_format):
+    from pyltc.tcgen import Generator
+    from pyltc import fields
+
+    def encode_fields(block):
+        a = np.zeros(80, dtype=bool)
+        for field in block.fields.values():
+            field.set_array(a)
+        if np.count_nonzero(a) % 2 == 1:
+            a[fields.ParityBit.start_bit] = True
+        return a
+
+    g = Generator(
+        use_current_time=False,
+        frame_format=ltc_frame_format,
+    )
+    assert np.array_equal(g.get_data_block_array(), encode_fields(g.data_block))
+    g.frame.set_total_frames(g.frame_format.frames_per_hour - 100)
+    for i in range(1000):
+        if i == 500:
+            g.data_block.fields['BinaryGroup3'].value = 0xA
+        data = g.get_data_block_array()
+        expected = encode_fields(g.data_block)
+        assert np.array_equal(data, expected)
+        assert g.get_data_block_value() == bools_to_int(expected)
+        assert g.get_data_block_string() == '{:080b}'.format(bools_to_int(expected))
+
+        # Returned arrays are not shared with the encoder state
+        data[:] = False
+        assert np.array_equal(g.get_data_block_array(), expected)
+
+        if i % 100 == 99:
+            g.incr_frame(1001)
+        elif i % 10 == 9:
+            g.frame.set_total_frames(i * 7919)
+        else:
+            g.incr_frame()
+
 def test_wave_write(ltc_frame_format, tmpdir):
     from pyltc.tcgen import AudioGenerator
+    from pyltc.audioutils import read_wavefile, write_wavefile
     num_frames = 900
     g = AudioGenerator(
         use_current_time=True,
@@ -76,11 +119,579 @@ def test_wave_write(ltc_frame_format, tmpdir):
     a = g.generate_frames(num_frames)
     print('min={}, max={}'.format(a.min(), a.max()))
     g.sampler.write_wavefile(a, filename)
-    rs, b = wavfile.read(filename)
+    rs, b = read_wavefile(filename)
     assert rs == g.sample_rate
     assert np.array_equal(a, b)
+    if wavfile is not None:
+        rs, c = wavfile.read(filename)
+        assert rs == g.sample_rate
+        assert np.array_equal(b, c)
+
+    for dtype in ['<f4', '>f8', '<i4']:
+        filename = os.path.join(str(tmpdir), 'test-{}.wav'.format(dtype[1:]))
+        c = np.linspace(-1, 1, 4801).astype(dtype)
+        if dtype[1] == 'i':
+            c *= 1 << 30
+        write_wavefile(filename, 44100, c)
+        rs, d = read_wavefile(filename)
+        assert rs == 44100
+        assert np.array_equal(c, d)
+        if wavfile is not None:
+            rs, d = wavfile.read(filename)
+            assert np.array_equal(c, d)
     if ltc_frame_format['rate'] == 29.97:
         num_samples = float(g.samples_per_frame * num_frames)
     else:
         num_samples = float(g.samples_per_frame * num_frames)
     assert b.size == num_samples
+
+def test_biphase_template(ltc_frame_format):
+    from pyltc.tcgen import AudioGenerator
+    g = AudioGenerator(
+        use_current_time=False,
+        bit_depth=16,
+        frame_format=ltc_frame_format,
+    )
+    template = g.sampler.template
+    num_samples = template.num_samples
+    assert num_samples == int(g.sample_rate / g.frame_format.rate)
+    edges = [i * num_samples // 160 for i in range(161)]
+    for i in range(30):
+        data = g.get_data_block_array()
+        samples = g.sampler.generate_samples(data)
+        assert samples.size == num_samples
+        assert samples.dtype == g.sampler.dtype
+
+        # Reference bi-phase mark encoding, one half-cell at a time
+        y = -1
+        cells = []
+        for v in data:
+            cells.append(y)
+            if v:
+                y *= -1
+            cells.append(y)
+            y *= -1
+        assert y == -1
+        for cell, (start, end) in enumerate(zip(edges[:-1], edges[1:])):
+            assert np.all(np.sign(samples[start:end]) == cells[cell])
+        g.incr_frame()
+
+def test_generate_frames(ltc_frame_format):
+    from pyltc.tcgen import AudioGenerator
+    num_frames = 45
+    kwargs = dict(
+        use_current_time=False,
+        bit_depth=16,
+        frame_format=ltc_frame_format,
+    )
+    g1 = AudioGenerator(**kwargs)
+    g2 = AudioGenerator(**kwargs)
+    a = g1.generate_frames(num_frames)
+    b = []
+    for i in range(num_frames):
+        b.append(g2.generate_frame())
+        g2.incr_frame()
+    b = np.concatenate(b)
+    assert a.dtype == g1.sampler.dtype
+    assert a.size == b.size
+    assert np.array_equal(a, b)
+    assert g1.frame == g2.frame
+
+    # Runs of mixed frame lengths render straight into the output buffer
+    import tracemalloc
+    template = g1.sampler.template
+    n = template.num_samples
+    lengths = [n, n + 1, n + 1, n, n, n + 2, n] * 40
+    data = np.random.RandomState(1).randint(0, 2, (len(lengths), 80)).astype(bool)
+    expected = np.concatenate([template.render(d, k) for d, k in zip(data, lengths)])
+    out = np.empty(expected.size, dtype=template.dtype)
+    tracemalloc.start()
+    try:
+        template.render_frames(data, lengths, out)
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert np.array_equal(out, expected)
+    assert peak < out.nbytes / 2
+
+def test_sample_clock(ltc_frame_format):
+    from fractions import Fraction
+    from pyltc.tcgen import AudioGenerator
+    for sample_rate in [44100, 48000, 96000]:
+        g = AudioGenerator(
+            use_current_time=False,
+            sample_rate=sample_rate,
+            frame_format=ltc_frame_format,
+        )
+        spf = Fraction(sample_rate) / g.frame_format.rate.value
+        assert g.samples_per_frame == spf
+        assert g.even_samples is (spf.denominator == 1)
+
+        offset = 0
+        for total_frames in range(3000):
+            num_samples, sample_offset = g.samples_for_frame(total_frames)
+            assert sample_offset == offset
+            assert abs(sample_offset - spf * total_frames) < 1
+            assert num_samples in (int(spf), int(spf) + 1)
+            offset += num_samples
+
+        # Roughly 40 days at 29.97
+        total_frames = 100000000
+        num_samples, sample_offset = g.samples_for_frame(total_frames)
+        assert abs(sample_offset - spf * total_frames) < 1
+
+        lengths, offsets = g.sample_clock.frame_lengths(total_frames, 10)
+        for i in range(10):
+            assert (lengths[i], offsets[i]) == g.samples_for_frame(total_frames + i)
+
+        a = g.generate_frames(10)
+        b = g.generate_frames(20)
+        _, end_offset = g.samples_for_frame(30)
+        assert a.size + b.size == end_offset
+
+def test_generate_into(ltc_frame_format):
+    from pyltc.tcgen import AudioGenerator
+    kwargs = dict(
+        use_current_time=False,
+        bit_depth=32,
+        use_float_samples=True,
+        dtype=np.dtype(np.float32),
+        frame_format=ltc_frame_format,
+    )
+    g1 = AudioGenerator(**kwargs)
+    g2 = AudioGenerator(**kwargs)
+    expected = g1.generate_frames(60)
+
+    a = np.zeros(expected.size, dtype=np.float32)
+    block_sizes = [1, 64, 1000, 1601, 2049, 256]
+    i = 0
+    while i < a.size:
+        block_size = block_sizes[i % len(block_sizes)]
+        out = a[i:i+block_size]
+        result = g2.generate_into(out)
+        assert result.base is a or result is out
+        i += out.size
+        assert g2.sample_position == i
+    assert np.array_equal(a, expected)
+    assert g1.frame == g2.frame
+
+    # Writable buffer-protocol objects, rewinding to the stream start
+    bfr = bytearray(expected.nbytes)
+    g2.generate_into(memoryview(bfr), start_sample=0)
+    assert np.array_equal(np.frombuffer(bfr, dtype=np.float32), expected)
+    assert g2.frame == g1.frame
+
+    # Seeking into the middle of a frame
+    g4 = AudioGenerator(**kwargs)
+    start = expected.size // 3
+    b = np.empty(expected.size - start, dtype=np.float32)
+    g4.generate_into(b, start_sample=start)
+    assert np.array_equal(b, expected[start:])
+
+    # Jumping between frames mid-render picks up the new frame's data
+    g4.seek_sample(100)
+    c = g4.generate_into(np.empty(50, dtype=np.float32))
+    assert np.array_equal(c, expected[100:150])
+    g4.seek_sample(start + 10)
+    c = g4.generate_into(np.empty(5000, dtype=np.float32))
+    assert np.array_equal(c, expected[start+10:start+5010])
+
+def test_iter_blocks(ltc_frame_format):
+    from pyltc.tcgen import AudioGenerator
+    kwargs = dict(
+        use_current_time=False,
+        bit_depth=16,
+        frame_format=ltc_frame_format,
+    )
+    g1 = AudioGenerator(**kwargs)
+    g2 = AudioGenerator(**kwargs)
+    expected = g1.generate_frames(60)
+    for block_size in [256, 1024, 4096]:
+        num_blocks = expected.size // block_size
+        blocks = list(g2.iter_blocks(block_size, num_blocks))
+        assert len(blocks) == num_blocks
+        for block in blocks:
+            assert block.size == block_size
+            assert block.dtype == g2.sampler.dtype
+        a = np.concatenate(blocks)
+        assert np.array_equal(a, expected[:a.size])
+        g2.seek_sample(0)
+
+def test_multichannel(ltc_frame_format):
+    from pyltc.tcgen import AudioGenerator, MultiChannelGenerator
+    starts = [
+        {'hours':0, 'minutes':0, 'seconds':0, 'frames':0},
+        {'hours':5, 'minutes':9, 'seconds':59, 'frames':20},
+        {'hours':23, 'minutes':59, 'seconds':59, 'frames':20},
+    ]
+    user_bits = [0, 0x12345678, 0xDEADBEEF]
+    kwargs = dict(
+        bit_depth=16,
+        sample_rate=44100,
+        frame_format=ltc_frame_format,
+    )
+    for layout in MultiChannelGenerator.layouts:
+        mc = MultiChannelGenerator(
+            frames=starts, user_bits=user_bits, layout=layout, **kwargs
+        )
+        assert mc.num_channels == len(starts)
+        generators = [
+            AudioGenerator(use_current_time=False, frame=dict(f), user_bits=ub, **kwargs)
+            for f, ub in zip(starts, user_bits)
+        ]
+        for num_frames in [7, 0, 31]:
+            a = mc.generate_frames(num_frames)
+            assert a.dtype == mc.dtype
+            for i, g in enumerate(generators):
+                expected = g.generate_frames(num_frames)
+                if layout == 'interleaved':
+                    assert a.shape == (expected.size, mc.num_channels)
+                    assert np.array_equal(a[:,i], expected)
+                else:
+                    assert a.shape == (mc.num_channels, expected.size)
+                    assert np.array_equal(a[i], expected)
+        assert [str(f) for f in mc.get_frames()] == [str(g.frame) for g in generators]
+
+    # Sample-granular blocks continue partially rendered frames
+    for layout in MultiChannelGenerator.layouts:
+        mc = MultiChannelGenerator(
+            frames=starts, user_bits=user_bits, layout=layout, **kwargs
+        )
+        generators = [
+            AudioGenerator(use_current_time=False, frame=dict(f), user_bits=ub, **kwargs)
+            for f, ub in zip(starts, user_bits)
+        ]
+        for block_size in [1000, 0, 37, 4096]:
+            if layout == 'interleaved':
+                a = mc.generate_into(np.empty((block_size, mc.num_channels), dtype=mc.dtype))
+            else:
+                a = mc.generate_into(np.empty((mc.num_channels, block_size), dtype=mc.dtype))
+            for i, g in enumerate(generators):
+                expected = g.generate_into(np.empty(block_size, dtype=g.dtype))
+                if layout == 'interleaved':
+                    assert np.array_equal(a[:,i], expected)
+                else:
+                    assert np.array_equal(a[i], expected)
+                assert mc.sample_position == g.sample_position
+        assert [str(f) for f in mc.get_frames()] == [str(g.frame) for g in generators]
+
+    mc = MultiChannelGenerator(offsets=[0, 10, 20], **kwargs)
+    frames = mc.get_frames()
+    assert [f.total_frames for f in frames] == [0, 10, 20]
+    with pytest.raises(ValueError):
+        mc.generate_frames(2, out=np.empty((3, 1)))
+    with pytest.raises(ValueError):
+        MultiChannelGenerator(layout='planar', **kwargs)
+
+def test_sample_alignment(ltc_frame_format):
+    from pyltc.tcgen import AudioGenerator
+    g = AudioGenerator(
+        use_current_time=False,
+        use_utc=True,
+        sample_rate=48000,
+        frame_format=ltc_frame_format,
+    )
+    fmt = g.frame_format
+    clock = g.get_wall_clock()
+    sample_ns = 1000000000 // g.sample_rate + 1
+    for total_frames in [0, 1, 2, 29, 1799, 1800, 17982, 107892, fmt.frames_per_day - 1]:
+        total_frames %= fmt.frames_per_day
+        start_ns = clock.total_frames_to_ns(total_frames)
+        assert clock.ns_to_total_frames(start_ns) == total_frames
+        next_ns = clock.total_frames_to_ns(total_frames + 1)
+        num_samples = g.samples_for_frame(0)[0]
+        for k in [0, 1, num_samples // 2, num_samples - 1]:
+            if start_ns + k * sample_ns >= next_ns:
+                continue
+            g.set_sample_from_ns(start_ns + k * sample_ns)
+            assert g.frame.total_frames == total_frames
+            assert g.frame_count == 0
+            assert g.frame_sample_offset == k
+
+    start_ns = clock.total_frames_to_ns(fmt.frames_per_day)
+    assert start_ns == clock.midnight_ns + clock.day_ns
+    g.set_sample_from_ns(clock.midnight_ns - sample_ns)
+    assert g.frame.total_frames == fmt.frames_per_day - 1
+    assert 0 < g.frame_sample_offset < g.samples_for_frame(0)[0]
+
+    # The aligned stream continues the timecode from the same sample
+    g.set_sample_from_ns(clock.total_frames_to_ns(100) + 10 * sample_ns)
+    a = g.generate_into(np.empty(4800, dtype=g.sampler.dtype))
+    g2 = AudioGenerator(
+        use_current_time=False,
+        sample_rate=48000,
+        frame_format=ltc_frame_format,
+        frame={'total_frames':100},
+    )
+    b = g2.generate_frames(6)
+    assert np.array_equal(a, b[10:4810])
+
+def test_decode_datablocks(ltc_frame_format):
+    from pyltc.tcgen import Generator
+    from pyltc.fields import decode_datablocks, TIMECODE_DTYPE
+    g = Generator(
+        use_current_time=False,
+        frame_format=ltc_frame_format,
+        frame={'hours':9, 'minutes':58},
+    )
+    num_frames = int(g.frame_format.rate.rounded * 60 * 3)
+    start_frames = g.frame.total_frames
+    data = np.zeros((num_frames, 80), dtype=bool)
+    expected = []
+    for i in range(num_frames):
+        data[i] = g.get_data_block_array()
+        expected.append(g.frame.get_hmsf_values())
+        g.incr_frame()
+    expected = np.array(expected)
+
+    result = decode_datablocks(data, g.frame_format)
+    assert result.dtype == TIMECODE_DTYPE
+    assert result.size == num_frames
+    assert np.array_equal(result['hours'], expected[:, 0])
+    assert np.array_equal(result['minutes'], expected[:, 1])
+    assert np.array_equal(result['seconds'], expected[:, 2])
+    assert np.array_equal(result['frames'], expected[:, 3])
+    assert np.array_equal(result['total_frames'], np.arange(num_frames) + start_frames)
+    assert np.all(result['drop_frame'] == bool(ltc_frame_format.get('drop_frame')))
+    assert np.all(result['color_frame'])
+    assert np.all(result['user_bits'] == 0)
+    assert np.all(result['parity_valid'])
+
+    data[::3, 5] = ~data[::3, 5]
+    result = decode_datablocks(data)
+    assert np.all(result['total_frames'] == -1)
+    assert not np.any(result['parity_valid'][::3])
+    assert np.all(result['parity_valid'][1::3])
+    assert np.all(result['user_bits'][::3] == 1 << 1)
+
+def test_pack_datablocks(ltc_frame_format):
+    from pyltc.tcgen import Generator
+    from pyltc.fields import (
+        DATABLOCK_SCHEMA, pack_datablocks, decode_datablocks,
+    )
+    g = Generator(
+        use_current_time=False,
+        frame_format=ltc_frame_format,
+    )
+    fmt = g.frame_format
+    drop_frame = bool(ltc_frame_format.get('drop_frame'))
+
+    start_frames = fmt.frames_per_day - 500
+    total_frames = start_frames + np.arange(1000)
+    g.frame.set_total_frames(start_frames)
+    g.data_block.fields['BinaryGroup5'].value = 7
+    data = g.data_block.get_arrays(total_frames)
+    assert data.shape == (1000, 80)
+    for i in range(data.shape[0]):
+        assert np.array_equal(data[i], g.get_data_block_array())
+        g.incr_frame()
+
+    rng = np.random.RandomState(42)
+    n = 500
+    hours = rng.randint(0, 24, n)
+    minutes = rng.randint(0, 60, n)
+    seconds = rng.randint(0, 60, n)
+    frames = rng.randint(0, fmt.rate.rounded, n)
+    user_bits = rng.randint(0, 1 << 32, n, dtype=np.int64)
+    data = pack_datablocks(
+        hours=hours, minutes=minutes, seconds=seconds, frames=frames,
+        drop_frame=drop_frame, color_frame=True, user_bits=user_bits,
+    )
+    result = decode_datablocks(data)
+    assert np.array_equal(result['hours'], hours)
+    assert np.array_equal(result['minutes'], minutes)
+    assert np.array_equal(result['seconds'], seconds)
+    assert np.array_equal(result['frames'], frames)
+    assert np.array_equal(result['user_bits'], user_bits)
+    assert np.all(result['drop_frame'] == drop_frame)
+    assert np.all(result['color_frame'])
+    assert np.all(result['parity_valid'])
+
+    for i in range(0, n, 50):
+        kw = dict(
+            hours=hours[i], minutes=minutes[i], seconds=seconds[i], frames=frames[i],
+            drop_frame=drop_frame, color_frame=True, user_bits=user_bits[i],
+        )
+        a = pack_datablocks(**kw)
+        assert a.shape == (80,)
+        assert np.array_equal(a, data[i])
+        assert DATABLOCK_SCHEMA.pack_value(**kw) == bools_to_int(a)
+
+def test_user_bits(ltc_frame_format):
+    from pyltc.tcgen import AudioGenerator
+    from pyltc.audioutils import LTCDataBlockDecoder
+
+    kw = dict(use_current_time=False, bit_depth=16, frame_format=ltc_frame_format)
+    g = AudioGenerator(user_bits=0x20261017, **kw)
+    assert g.user_bits == 0x20261017
+    data = g.get_data_block_array()
+    assert np.count_nonzero(data) % 2 == 0
+    assert g.data_block.fields['BinaryGroup1'].value == 0x7
+    assert g.data_block.fields['BinaryGroup8'].value == 0x2
+    g.data_block.fields['BinaryGroup8'].value = 0xF
+    assert g.user_bits == 0xF0261017
+
+    num_frames = 200
+    payloads = (np.arange(num_frames, dtype=np.uint64) * 0x9E3779B1) & 0xFFFFFFFF
+    payloads = payloads.astype(np.uint32)
+
+    # Batch, per-frame and block rendering all embed one payload per frame
+    g1 = AudioGenerator(**kw)
+    g1.set_user_bits(payloads)
+    batch = np.concatenate([g1.generate_frames(50) for i in range(4)])
+    assert g1.user_bits == payloads[-1]
+
+    g2 = AudioGenerator(**kw)
+    g2.set_user_bits(iter(payloads.tolist()))
+    single = []
+    for i in range(num_frames):
+        single.append(g2.generate_frame())
+        g2.incr_frame()
+    single = np.concatenate(single)
+    assert np.array_equal(batch, single)
+
+    g3 = AudioGenerator(**kw)
+    g3.set_user_bits(payloads)
+    out = np.empty(batch.size, dtype=g3.sampler.dtype)
+    for i in range(0, out.size, 1000):
+        g3.generate_into(out[i:i+1000])
+    assert np.array_equal(out, batch)
+
+    decoder = LTCDataBlockDecoder(frame_format=g1.frame_format)
+    blocks, timecodes = decoder.decode_timecodes(batch)
+    assert timecodes.size >= num_frames - 2
+    assert np.all(timecodes['parity_valid'])
+    assert np.array_equal(timecodes['user_bits'], payloads[timecodes['total_frames']])
+
+    # The last payload is held once the stream runs out
+    g1.set_user_bits([1, 2, 3])
+    g1.generate_frames(5)
+    assert g1.user_bits == 3
+    assert g1.user_bits_stream is None
+    data = g1.data_block.get_arrays(np.arange(2), user_bits=[0xFFFFFFFF, 0])
+    assert np.count_nonzero(data[0, [4, 12, 20, 28, 36, 44, 52, 60]]) == 8
+
+def test_timer_deadlines(frame_format):
+    import time
+    from pyltc.tcgen import FreeRunGenerator, TimerThread
+
+    g = FreeRunGenerator(use_current_time=False, frame_format=frame_format)
+    fr = g.frame_format.rate
+    timer = TimerThread(g)
+    timer.reset(start_ns=0)
+
+    # Absolute deadlines from the rational period never drift
+    one_hour = fr.numerator * 3600
+    assert timer.get_deadline(one_hour) == fr.denom * 3600 * 1000000000
+    for tick in [1, 2, 1001, 30000, one_hour - 1]:
+        deadline = timer.get_deadline(tick)
+        assert timer.get_tick(deadline) == tick
+        assert timer.get_tick(deadline - 1) == tick - 1
+
+    # On time
+    assert timer.advance(timer.get_deadline(1) + 1000) == 1
+    assert g.frame.total_frames == 1
+    # Late by more than two periods, skipping to the most recent deadline
+    assert timer.advance(timer.get_deadline(5) + 10) == 4
+    assert timer.tick == 5
+    assert g.frame.total_frames == 5
+    stats = g.tick_stats.get_stats()
+    assert stats['count'] == 2
+    assert stats['skipped'] == 3
+    assert stats['min'] == 10
+    assert stats['max'] == 1000
+    assert stats['p50'] == 505
+
+    g = FreeRunGenerator(
+        use_current_time=False, frame_format=frame_format, overrun_policy='catch_up',
+    )
+    timer = TimerThread(g)
+    timer.reset(start_ns=0)
+    now = timer.get_deadline(5) + 10
+    for tick in range(1, 6):
+        assert timer.advance(now) == 1
+        assert g.frame.total_frames == tick
+    assert g.tick_stats.skipped == 0
+    assert g.tick_stats.max == now - timer.get_deadline(1)
+
+def test_free_run():
+    import time
+    from pyltc.tcgen import FreeRunGenerator
+
+    g = FreeRunGenerator(use_current_time=False, frame_format={'rate':29.97})
+    g.start(loop=False)
+    start_ts = time.time()
+    time.sleep(.5)
+    g.stop()
+    elapsed = time.time() - start_ts
+    stats = g.tick_stats.get_stats()
+    expected = elapsed * g.frame_format.rate.float_value
+    assert abs(g.frame.total_frames - expected) <= 3
+    assert stats['count'] + stats['skipped'] == g.frame.total_frames
+    assert stats['min'] >= 0
+    assert stats['p99'] <= stats['max']
+
+def test_frame_subscribers():
+    import threading
+    from pyltc.tcgen import FreeRunGenerator, TimerThread, FrameSnapshot
+
+    g = FreeRunGenerator(use_current_time=False, frame_format={'rate':29.97})
+    timer = TimerThread(g)
+    timer.reset(start_ns=0)
+    fast = g.subscribe(maxsize=100)
+    slow = g.subscribe(maxsize=3)
+    for tick in range(1, 11):
+        timer.advance(timer.get_deadline(tick))
+
+    snapshots = [fast.get(timeout=0) for i in range(10)]
+    assert [s.tick for s in snapshots] == list(range(1, 11))
+    for s in snapshots:
+        assert isinstance(s, FrameSnapshot)
+        assert s.timecode.total_frames == s.tick
+        assert s.timestamp_ns == timer.get_deadline(s.tick)
+        assert len(s.get_string()) == 80
+        assert int(s.get_string(), 2) == s.value
+        with pytest.raises(AttributeError):
+            s.value = 0
+    assert snapshots[-1].value == g.get_data_block_value()
+    assert g.last_snapshot is snapshots[-1]
+    assert fast.get(timeout=0) is None
+
+    # Slow consumers keep the newest frames and share the same objects
+    assert slow.dropped == 7
+    assert [slow.get(timeout=0) for i in range(3)] == snapshots[-3:]
+
+    blocking = g.subscribe(maxsize=2, policy='block')
+    received = []
+    def consume():
+        for snapshot in blocking:
+            received.append(snapshot.tick)
+    t = threading.Thread(target=consume)
+    t.start()
+    for tick in range(11, 31):
+        timer.advance(timer.get_deadline(tick))
+    g.unsubscribe(blocking)
+    t.join(5)
+    assert not t.is_alive()
+    assert received == list(range(11, 31))
+    assert blocking.dropped == 0
+
+    with pytest.raises(ValueError):
+        g.subscribe(policy='foo')
+
+def test_blocked_subscriber_stop():
+    import time
+    from pyltc.tcgen import FreeRunGenerator
+
+    g = FreeRunGenerator(use_current_time=False, frame_format={'rate':30})
+    stalled = g.subscribe(maxsize=1, policy='block')
+    g.start(loop=False)
+    t = g.run_thread
+    while not stalled.queue.full():
+        g.wait_for_frame(1)
+    # The timer thread is now stuck waiting for room in the queue
+    time.sleep(.2)
+    g.stop()
+    t.join(5)
+    assert not t.is_alive()
+    assert stalled.closed
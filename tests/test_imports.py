@@ -0,0 +1,33 @@
+import sys
+import subprocess
+
+IMPORT_BUDGETS = {
+    'pyltc.frames':.5,
+    'pyltc.tcgen':1.,
+}
+
+SCRIPT = '''
+import sys, time
+start = time.time()
+import {module}
+print(time.time() - start)
+print(' '.join(sorted(set(m.split('.')[0] for m in sys.modules))))
+'''
+
+def check_import(module):
+    out = subprocess.check_output([sys.executable, '-c', SCRIPT.format(module=module)])
+    lines = out.decode().splitlines()
+    return float(lines[0]), set(lines[1].split(' '))
+
+def test_import_budget():
+    for module, budget in IMPORT_BUDGETS.items():
+        elapsed, modules = check_import(module)
+        assert 'scipy' not in modules
+        assert 'pkg_resources' not in modules
+        assert elapsed < budget, '{} took {:.3f}s'.format(module, elapsed)
+    elapsed, modules = check_import('pyltc.frames')
+    assert 'numpy' not in modules
+
+def test_version():
+    import pyltc
+    assert isinstance(pyltc.__version__, str)